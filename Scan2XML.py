@@ -5,31 +5,183 @@ clr.AddReference('RevitNodes')
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
 
-from Autodesk.DesignScript.Geometry import Point as DSPoint, Line as DSLine
+from Autodesk.DesignScript.Geometry import Point as DSPoint, Line as DSLine, PolyCurve as DSPolyCurve
 from RevitServices.Persistence import DocumentManager
 from RevitServices.Transactions import TransactionManager
 from Autodesk.Revit.DB import *
 
-import xml.etree.ElementTree as ET
 import math
+import os
+import sys
 import System
 import re
 from System.Collections.Generic import List
 import datetime
 
 ###############################################################
-# Função para converter metros para pés
+# Localização do pacote scanxml (mesma pasta deste script).
+# O nó "Python Script From String" não define __file__; no
+# ScanXMLtoRevit.dyn, IN[6] recebe o caminho deste script (o mesmo nó
+# "Script Python" que alimenta o FileSystem.ReadText) ou a pasta.
 ###############################################################
-def meters_to_feet(meters):
-    return meters * 3.28084
+def resolve_scanxml_dir():
+    if len(IN) > 6 and IN[6]:
+        path = os.path.abspath(str(IN[6]))
+        return os.path.dirname(path) if path.lower().endswith('.py') else path
+    if '__file__' in globals():
+        return os.path.dirname(os.path.abspath(__file__))
+    raise ImportError("Pacote scanxml não encontrado: ligue em IN[6] o caminho do "
+                      "Scan2XML.py (a pasta que contém scanxml/).")
+
+_scanxml_dir = resolve_scanxml_dir()
+if _scanxml_dir not in sys.path:
+    sys.path.append(_scanxml_dir)
+
+from scanxml.catalog import (build_catalog, build_thickness_catalog, size_key, thickness_key,
+                             type_name, wall_type_name)
+from scanxml.cache import file_digest, load_scan_cached
+from scanxml.chunks import ChunkProgress, plan_chunks, progress_path
+from scanxml.levels import match_levels, partition_storeys, storey_level_name
+from scanxml.merge import merge_collinear_walls
+from scanxml.pipeline import ScanProducer
+from scanxml.plan import PLAN_SUFFIX, load_plan
+from scanxml.planfile import PLANFILE_SUFFIX, MappedPlan, load_planfile
+from scanxml.openings import plan_openings
+from scanxml.reader import iter_walls
+from scanxml.spatial import connected_walls, snap_endpoints
+from scanxml.sync import diff_scan, make_tag, parse_tag, scan_scope
+from scanxml.timing import PhaseTimer, write_timing_log
+from scanxml.vectorized import wall_endpoints_batch
+
+###############################################################
+# Grava o relatório de tempos em <xml>.timing.json ao lado do XML
+###############################################################
+WRITE_TIMING_LOG = False
+
+###############################################################
+# Reaproveita o scan decodificado (<xml>.scancache) enquanto o XML
+# não mudar, evitando reler o arquivo quando o Dynamo reexecuta o nó
+###############################################################
+USE_SCAN_CACHE = True
+
+###############################################################
+# Re-sincronização: em vez de criar tudo de novo, compara o XML com as
+# paredes etiquetadas por execuções anteriores e só cria/recria/apaga
+# as que mudaram (ver scanxml/sync.py). Nesse modo não há agrupamento.
+# SYNC_SCOPE nomeia o ambiente escaneado (ex.: 'Apto 305'): os novos
+# scans do mesmo ambiente, com qualquer nome de arquivo, atualizam as
+# mesmas paredes. Com None, o escopo é o nome do arquivo de IN[0].
+###############################################################
+SYNC_MODE = False
+SYNC_SCOPE = None
+
+###############################################################
+# Criação em lotes: com CHUNK_SIZE > 0, paredes e aberturas são
+# confirmadas em transações de até CHUNK_SIZE elementos e o progresso
+# fica em <xml>.progress.json, permitindo retomar após uma falha.
+# Com 0, tudo é criado em uma única transação. Os lotes confirmados
+# aparecem no relatório de tempos (chunks_committed); PROGRESS_CALLBACK,
+# se definido, é chamado com (paredes feitas, total de paredes, lotes
+# feitos, total de lotes) após cada lote (o print não aparece no Dynamo).
+###############################################################
+CHUNK_SIZE = 0
+PROGRESS_CALLBACK = None
+
+###############################################################
+# Pré-visualização no Dynamo (OUT[0] e OUT[1]). A geometria da criação
+# é calculada em floats; os objetos do Dynamo só são criados para a
+# pré-visualização:
+#   'full'      - uma linha por parede (como antes)
+#   'decimated' - no máximo PREVIEW_LIMIT elementos; com
+#                 PREVIEW_JOIN_ROOMS, uma PolyCurve por cômodo
+#   'off'       - nenhuma geometria
+###############################################################
+PREVIEW_MODE = 'full'
+PREVIEW_LIMIT = 2000
+PREVIEW_JOIN_ROOMS = True
+
+###############################################################
+# Modo em fluxo: com PIPELINE_BATCH > 0, uma thread lê o XML e calcula a
+# geometria em lotes desse tamanho (no máximo PIPELINE_QUEUE lotes
+# prontos na fila) enquanto as paredes e aberturas dos lotes anteriores
+# são criadas. Como as paredes chegam aos poucos, nesse modo não há
+# junção de nós, união de colineares, vários pavimentos nem lotes com
+# retomada, e ele não pode ser usado com SYNC_MODE.
+###############################################################
+PIPELINE_BATCH = 0
+PIPELINE_QUEUE = 4
+
+###############################################################
+# Junta as extremidades das paredes a até ~1 cm umas das outras em nós
+# compartilhados, fechando os cômodos antes da criação
+# (ver scanxml/spatial.py). Desligado por padrão: muda as extremidades
+# das paredes criadas em relação às versões anteriores.
+###############################################################
+SNAP_ENDPOINTS = False
+
+###############################################################
+# Une segmentos colineares encadeados (mesma altura e espessura) em uma
+# única parede antes da criação (ver scanxml/merge.py). Desligado por
+# padrão: muda o número de paredes criadas em relação às versões anteriores.
+###############################################################
+MERGE_COLLINEAR_WALLS = False
+
+###############################################################
+# Importação em vários pavimentos: as paredes são agrupadas pela cota
+# (position y do XML) e cada grupo vai para o nível existente mais
+# próximo ou para um nível novo criado na cota do pavimento
+# (ver scanxml/levels.py). Com False, tudo vai para o nível de IN[1].
+###############################################################
+MULTI_LEVEL = False
+
+###############################################################
+# Tipo de parede por espessura do XML (<thickness>): usa o tipo de IN[2]
+# quando a espessura coincide e, para as demais, duplica esse tipo
+# ajustando a camada de núcleo (ou reaproveita o duplicado anterior).
+# Desligado por padrão: muda os tipos das paredes criadas e acrescenta
+# tipos ao projeto em relação às versões anteriores.
+###############################################################
+WALL_TYPES_BY_THICKNESS = False
+
+###############################################################
+# Pré-dimensionamento: um FamilySymbol por tamanho de abertura
+# (largura x altura, ~1 cm), duplicado dos tipos escolhidos no Dynamo
+# ou reaproveitado se já existir. Só vale para famílias cujas dimensões
+# são parâmetros de tipo; nas demais, a largura/altura vai na instância.
+# Desligado por padrão: arredonda as dimensões das aberturas e, como os
+# tamanhos do scan são contínuos, cria quase um tipo por abertura.
+###############################################################
+PRESIZE_OPENING_TYPES = False
+
+###############################################################
+# Leitor do XML (ver scanxml/reader.py), todos com o mesmo resultado:
+#   'stdlib' - xml.etree.ElementTree (padrão)
+#   'lxml'   - mais rápido quando o lxml está disponível; sem ele,
+#              volta para 'stdlib'
+#   'regex'  - tokenizador próprio do formato eoxObjects sobre o arquivo
+#              mapeado em memória, sem montar a árvore
+###############################################################
+XML_BACKEND = 'stdlib'
+
+###############################################################
+# Leitura paralela: com SHARD_WORKERS > 0, um XML grande é dividido em
+# fatias nos limites dos <object> e cada fatia é lida com o leitor de
+# XML_BACKEND e tem a geometria calculada em um processo separado (ver
+# scanxml/shards.py), com o resultado na ordem do arquivo. Como o Python
+# do Dynamo roda dentro do Revit, os processos precisam de um executável
+# Python: SHARD_PYTHON (ex.: r'C:\Python39\python.exe'). Não vale para o
+# modo em fluxo.
+###############################################################
+SHARD_WORKERS = 0
+SHARD_PYTHON = None
 
 ###############################################################
 # Função para ler o arquivo XML
+# Leitura incremental: gera um WallRecord (valores em pés) por vez
+# (ver scanxml/reader.py), sem manter a árvore inteira em memória.
 ###############################################################
 def parse_xml(file_path):
-    tree = ET.parse(file_path)
-    root = tree.getroot()
-    return root
+    return iter_walls(file_path, XML_BACKEND)
 
 ###############################################################
 # Função para multiplicar dois quaternions
@@ -70,272 +222,521 @@ def apply_quaternion_rotation(point, origin, q):
     return DSPoint.ByCoordinates(new_x, new_y, new_z)'''
 
 ###############################################################
-# Função para transformar um ponto do sistema XML para o sistema Dynamo
+# Função para criar a linha base e aplicar a transformação
+# (extremidades calculadas em lote no scanxml.vectorized; DSPoint só no final)
 ###############################################################
-def transform_point(point):
-    x_new = point.X
-    y_new = -point.Z  # correção eficaz para o posicionamento
-    z_new = point.Y
-    return DSPoint.ByCoordinates(x_new, y_new, z_new)
+def create_and_transform_line(start, end):
+    return [DSPoint.ByCoordinates(*start), DSPoint.ByCoordinates(*end)]
 
 ###############################################################
-# Função para transformar um quaternion do sistema XML para o sistema Dynamo
+# Geometria de pré-visualização: retorna (curvas, pontos iniciais)
 ###############################################################
-def transform_quaternion(q):
-    w, x, y, z = q
-    # Trocar Y por Z
-    return (w, x, z, y)
+def build_preview(endpoints, mode, limit, join_rooms):
+    if mode == 'off':
+        return [], []
+    if mode == 'decimated' and join_rooms:
+        # Pontas a ~1 cm contam como ligadas; na pré-visualização elas são
+        # unidas no nó, para que a PolyCurve de cada cômodo feche
+        endpoints = snap_endpoints(endpoints)[0]
+        groups = connected_walls(endpoints)
+    else:
+        groups = [[i] for i in range(len(endpoints))]
+    if mode == 'decimated' and len(groups) > limit:
+        stride = int(math.ceil(len(groups) / float(limit)))
+        groups = groups[::stride]
+
+    curves = []
+    points = []
+    for group in groups:
+        group_lines = []
+        for i in group:
+            line_points = create_and_transform_line(*endpoints[i])
+            group_lines.append(DSLine.ByStartPointEndPoint(line_points[0], line_points[1]))
+            points.append(line_points[0])
+        if len(group_lines) > 1:
+            try:
+                curves.append(DSPolyCurve.ByJoinedCurves(group_lines))
+                continue
+            except Exception:
+                pass  # trecho com ramificações: fica em linhas soltas
+        curves.extend(group_lines)
+    return curves, points
 
 ###############################################################
-# Função para criar a linha base e aplicar a transformação
+# Ativar FamilySymbols, se não estiverem ativos
+# (todos de uma vez; a regeneração fica a cargo de quem chama)
 ###############################################################
-def create_and_transform_line(original_start_point, length, rotation_quat):
-    # Criar ponto final no sistema de coordenadas original
-    end_point = DSPoint.ByCoordinates(original_start_point.X + length, original_start_point.Y, original_start_point.Z)
-    
-    # Aplicar rotação ao ponto final em torno do ponto inicial
-    if rotation_quat is not None:
-        end_point = apply_quaternion_rotation(end_point, original_start_point, rotation_quat)
-    
-    # Aplicar a transformação aos pontos
-    transformed_start_point = transform_point(original_start_point)
-    transformed_end_point = transform_point(end_point)
-    
-    return [transformed_start_point, transformed_end_point]
+def activate_family_symbols(family_symbols):
+    activated = False
+    for family_symbol in family_symbols:
+        if not family_symbol.IsActive:
+            family_symbol.Activate()
+            activated = True
+    return activated
+
+###############################################################
+# Executa uma etapa dentro de uma SubTransaction: em caso de erro,
+# só essa etapa é desfeita e a transação principal continua aberta
+###############################################################
+def run_checkpoint(doc, action, *args):
+    sub_transaction = SubTransaction(doc)
+    sub_transaction.Start()
+    try:
+        result = action(*args)
+    except Exception:
+        sub_transaction.RollBack()
+        raise
+    sub_transaction.Commit()
+    return result
 
 ###############################################################
-# Ativar FamilySymbol, se não estiver ativo
+# Etiquetas de sincronização (parâmetro Comentários)
 ###############################################################
-def activate_family_symbol(family_symbol):
-    if not family_symbol.IsActive:
-        family_symbol.Activate()
-        DocumentManager.Instance.CurrentUIApplication.ActiveUIDocument.Document.Regenerate()
+def set_scan_tag(element, tag):
+    param = element.get_Parameter(BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS)
+    if param and not param.IsReadOnly:
+        param.Set(tag)
+
+def collect_scan_walls(doc, scope):
+    """
+    Lê as etiquetas das paredes criadas em execuções anteriores com o mesmo
+    escopo (ambiente e nível; ver scanxml.sync.scan_scope).
+    Retorna ({chave: impressão}, {chave: ElementId}).
+    """
+    fingerprints = {}
+    element_ids = {}
+    for wall in FilteredElementCollector(doc).OfClass(Wall):
+        param = wall.get_Parameter(BuiltInParameter.ALL_MODEL_INSTANCE_COMMENTS)
+        parsed = parse_tag(param.AsString() if param else None, scope)
+        if parsed is not None:
+            key, fingerprint = parsed
+            fingerprints[key] = fingerprint
+            element_ids[key] = wall.Id
+    return fingerprints, element_ids
+
+def delete_scan_walls(doc, element_ids):
+    # Apagar a parede apaga também as portas e janelas hospedadas
+    if not element_ids:
+        return
+    doc.Delete(List[ElementId](element_ids))
 
 ###############################################################
 # Criação das paredes no Revit
 ###############################################################
-def create_walls_in_revit(doc, lines, level, heights, wall_family_name, created_element_ids):
-    TransactionManager.Instance.EnsureInTransaction(doc)
-    walls = []
-    for line, height in zip(lines, heights):
-        start_point = line.StartPoint
-        end_point = line.EndPoint
-        revit_line = Line.CreateBound(
-            XYZ(start_point.X, start_point.Y, start_point.Z),
-            XYZ(end_point.X, end_point.Y, end_point.Z)
-        )
+def create_walls_in_revit(doc, lines, levels, heights, wall_types, created_element_ids, tags=None):
+    # Deve ser chamada com a transação já aberta. 'lines' traz o
+    # (início, fim) de cada parede em pés; 'levels' e 'wall_types' o Level
+    # e o WallType de cada linha. As paredes são criadas agrupadas por
+    # nível e tipo e devolvidas na ordem das linhas.
+    walls = [None] * len(lines)
+    order = sorted(range(len(lines)), key=lambda i: (levels[i].Id.IntegerValue, wall_types[i].Id.IntegerValue))
+    for i in order:
+        start_point, end_point = lines[i]
+        height = heights[i]
+        revit_line = Line.CreateBound(XYZ(*start_point), XYZ(*end_point))
         wall = Wall.Create(
             doc,
             revit_line,
-            wall_family_name.Id,
-            level.Id,
+            wall_types[i].Id,
+            levels[i].Id,
             height,
             0.0,
             False,
             False
         )
-        walls.append(wall)
+        if tags is not None:
+            set_scan_tag(wall, tags[i])
+        walls[i] = wall
         created_element_ids.Add(wall.Id)
-    TransactionManager.Instance.TransactionTaskDone()
     return walls
+
 ###############################################################
-# Auxiliares para rotação de pontos
+# Regra de filtro "parâmetro == texto". Revit 2023+ tem a sobrecarga
+# (ElementId, str); a com caseSensitive ficou obsoleta e depois foi
+# removida, então só é usada nas versões antigas.
 ###############################################################
+def equals_rule(parameter_id, value):
+    try:
+        return ParameterFilterRuleFactory.CreateEqualsRule(parameter_id, value)
+    except TypeError:
+        return ParameterFilterRuleFactory.CreateEqualsRule(parameter_id, value, True)
 
-def quaternion_multiply(q1, q2):
-    w1, x1, y1, z1 = q1
-    w2, x2, y2, z2 = q2
-    w = w1*w2 - x1*x2 - y1*y2 - z1*z2
-    x = w1*x2 + x1*w2 + y1*z2 - z1*y2
-    y = w1*y2 - x1*z2 + y1*w2 + z1*x2
-    z = w1*z2 + x1*y2 - y1*x2 + z1*w2
-    return (w, x, y, z)
+###############################################################
+# Resolução do nível de IN[1]: aceita o Level (desembrulhado do
+# Dynamo), um ElementId ou um nome. A busca por nome usa um filtro de
+# parâmetro (DATUM_TEXT) e guarda o resultado em um dicionário.
+###############################################################
+class LevelIndex(object):
+    def __init__(self, doc):
+        self.doc = doc
+        self._by_name = {}
+        self._all = None
+
+    def all(self):
+        """Todos os níveis do documento (coletados uma única vez)."""
+        if self._all is None:
+            self._all = list(FilteredElementCollector(self.doc).OfClass(Level).ToElements())
+            for lvl in self._all:
+                self._by_name.setdefault(lvl.Name, lvl)
+        return self._all
+
+    def by_name(self, name):
+        if name in self._by_name or self._all is not None:
+            return self._by_name.get(name)
+        rule = equals_rule(ElementId(BuiltInParameter.DATUM_TEXT), name)
+        found = (FilteredElementCollector(self.doc).OfClass(Level)
+                 .WherePasses(ElementParameterFilter(rule)).FirstElement())
+        self._by_name[name] = found
+        return found
+
+    def resolve(self, level_info):
+        element = UnwrapElement(level_info)
+        if isinstance(element, Level):
+            return element
+        if isinstance(element, ElementId):
+            found = self.doc.GetElement(element)
+            if not isinstance(found, Level):
+                raise ValueError(f"ElementId {element.IntegerValue} não é um nível.")
+            return found
+
+        name = getattr(level_info, 'Name', None)
+        if name is None:
+            text = str(level_info)
+            name_match = re.search(r"Name=([^,]+),", text)
+            name = name_match.group(1) if name_match else text
+        found = self.by_name(name)
+        if found is None:
+            raise ValueError(f"Nível com nome '{name}' não encontrado.")
+        return found
 
-def quaternion_conjugate(q):
-    w, x, y, z = q
-    return (w, -x, -y, -z)
+###############################################################
+# Níveis dos pavimentos: usa o nível existente associado a cada
+# pavimento ou cria um novo na cota do pavimento. Se já houver um nível
+# com o nome do pavimento (de outra cota, pois os da mesma cota já foram
+# associados), o novo recebe um nome livre. Deve ser chamada com a
+# transação aberta; retorna um Level por pavimento.
+###############################################################
+def create_storey_levels(doc, elevations, matches, levels):
+    storey_levels = []
+    names = None
+    for elevation, match in zip(elevations, matches):
+        if match is not None:
+            storey_levels.append(levels[match])
+            continue
+        if names is None:
+            names = set(level.Name for level in LevelIndex(doc).all())
+        base_name = name = storey_level_name(elevation)
+        suffix = 2
+        while name in names:
+            name = '{} ({})'.format(base_name, suffix)
+            suffix += 1
+        new_level = Level.Create(doc, elevation)
+        new_level.Name = name
+        names.add(name)
+        storey_levels.append(new_level)
+    return storey_levels
 
-def apply_quaternion_rotation(point, pivot, q):
+###############################################################
+# Tipos de parede por espessura (ver scanxml/catalog.py).
+# A CompoundStructure do tipo base é lida uma vez; cada tipo novo recebe
+# a mesma estrutura com a camada de núcleo ajustada para a espessura.
+# Um tipo já existente com o mesmo nome só é reaproveitado se a sua
+# largura coincidir; senão, o novo tipo recebe um nome livre.
+# Retorna {chave: WallType}; deve ser chamada com a transação aberta.
+###############################################################
+def wall_type_thickness_key(wall_type):
+    structure = wall_type.GetCompoundStructure()
+    return None if structure is None else thickness_key(structure.GetWidth())
+
+def resolve_wall_types(doc, base_type, thicknesses, timer=None):
+    base_structure = base_type.GetCompoundStructure()
+    if base_structure is None:
+        return {}  # parede cortina/empilhada: sem camadas para ajustar
+    base_width = base_structure.GetWidth()
+    core_index = max(base_structure.GetFirstCoreLayerIndex(), 0)
+    core_width = base_structure.GetLayerWidth(core_index)
+
+    existing = {}
+    for wall_type in FilteredElementCollector(doc).OfClass(WallType):
+        existing[wall_type.Name] = wall_type
+
+    wall_types = {}
+    for key, thickness in thicknesses.items():
+        if key == thickness_key(base_width) or core_width + thickness - base_width <= 0.0:
+            wall_types[key] = base_type
+            continue
+        name = wall_type_name(base_type.Name, key)
+        wall_type = existing.get(name)
+        if wall_type is not None and wall_type_thickness_key(wall_type) == key:
+            if timer is not None:
+                timer.count('wall_types_reused')
+        else:
+            # Nome livre: o tipo com esse nome pode ter sido editado no projeto
+            suffix = 2
+            while name in existing:
+                name = '{} ({})'.format(wall_type_name(base_type.Name, key), suffix)
+                suffix += 1
+            wall_type = base_type.Duplicate(name)
+            structure = wall_type.GetCompoundStructure()
+            structure.SetLayerWidth(core_index, core_width + thickness - base_width)
+            wall_type.SetCompoundStructure(structure)
+            existing[name] = wall_type
+            if timer is not None:
+                timer.count('wall_types_created')
+        wall_types[key] = wall_type
+    return wall_types
+
+###############################################################
+# Parâmetros das aberturas resolvidos uma vez por FamilySymbol
+###############################################################
+class OpeningParameterResolver(object):
     """
-    Rotaciona 'point' ao redor de 'pivot' usando o quaternion 'q'.
-    point e pivot são XYZ do Revit ou DSPoint convertidos.
-    Retorna o ponto rotacionado (XYZ).
+    Resolve os parâmetros de largura, altura, peitoril e nível na primeira
+    instância de cada FamilySymbol (pelo nome em português ou inglês e, se
+    não houver, pelo BuiltInParameter) e guarda a Definition encontrada.
+    As instâncias seguintes usam get_Parameter(Definition), sem
+    LookupParameter por nome. O valor inicial da primeira instância (padrão
+    da família) também é guardado, e Set é pulado quando o valor desejado
+    já é igual a ele.
     """
-    # Converter para quaternion com w = 0, relativo ao pivot
-    px = point.X - pivot.X
-    py = point.Y - pivot.Y
-    pz = point.Z - pivot.Z
-    p = (0, px, py, pz)
-    
-    q_conj = quaternion_conjugate(q)
-    # Rotação: q * p * q^-1
-    q_p = quaternion_multiply(q, p)
-    rotated_p = quaternion_multiply(q_p, q_conj)
-    
-    # Volta para coordenadas globais
-    rx = rotated_p[1] + pivot.X
-    ry = rotated_p[2] + pivot.Y
-    rz = rotated_p[3] + pivot.Z
-    return XYZ(rx, ry, rz)
 
-def quaternion_from_angle_z(angle):
-    half = angle / 2.0
-    return (math.cos(half), 0.0, 0.0, math.sin(half))
+    PARAMETERS = (
+        ('width', ("Largura", "Width"), 'FAMILY_WIDTH_PARAM'),
+        ('height', ("Altura", "Height"), 'FAMILY_HEIGHT_PARAM'),
+        ('parapet', ("Altura do peitoril", "Sill Height"), 'INSTANCE_SILL_HEIGHT_PARAM'),
+        ('level', ("Base Level", "Nível base", "Level", "Nível"), 'FAMILY_LEVEL_PARAM'),
+    )
+
+    def __init__(self):
+        self._handles = {}
+        self._defaults = {}
+
+    def _resolve(self, instance):
+        handles = {}
+        defaults = {}
+        for key, names, built_in in self.PARAMETERS:
+            handle = None
+            param = None
+            for name in names:
+                param = instance.LookupParameter(name)
+                if param is not None:
+                    handle = param.Definition
+                    break
+            if handle is None and hasattr(BuiltInParameter, built_in):
+                handle = getattr(BuiltInParameter, built_in)
+                param = instance.get_Parameter(handle)
+                if param is None:
+                    handle = None
+            handles[key] = handle
+            if param is not None:
+                defaults[key] = param.AsElementId() if key == 'level' else param.AsDouble()
+        return handles, defaults
+
+    def set(self, instance, symbol, key, value):
+        """Atribui 'value' ao parâmetro 'key'. Retorna True se Set foi chamado."""
+        symbol_id = symbol.Id.IntegerValue
+        if symbol_id not in self._handles:
+            self._handles[symbol_id], self._defaults[symbol_id] = self._resolve(instance)
+        handle = self._handles[symbol_id][key]
+        if handle is None:
+            return False
+        default = self._defaults[symbol_id].get(key)
+        if default is not None and (default == value if key == 'level' else abs(default - value) < 1e-9):
+            return False
+        param = instance.get_Parameter(handle)
+        if param is None or param.IsReadOnly:
+            return False
+        param.Set(value)
+        return True
+
+
+###############################################################
+# Tipos de abertura pré-dimensionados (ver scanxml/catalog.py).
+# Retorna {size_key: (símbolo, largura, altura)}; deve ser chamada com a
+# transação aberta. Os tipos novos já saem ativados.
+###############################################################
+def lookup_type_parameter(symbol, key):
+    for param_key, names, built_in in OpeningParameterResolver.PARAMETERS:
+        if param_key != key:
+            continue
+        for name in names:
+            param = symbol.LookupParameter(name)
+            if param is not None:
+                return param
+        if hasattr(BuiltInParameter, built_in):
+            return symbol.get_Parameter(getattr(BuiltInParameter, built_in))
+    return None
+
+def presize_opening_types(doc, symbols_by_kind, catalog, timer=None):
+    existing = {}
+    for symbol in FilteredElementCollector(doc).OfClass(FamilySymbol):
+        existing[(symbol.Family.Name, symbol.Name)] = symbol
+
+    opening_types = {}
+    for size in catalog:
+        kind = size.key[0]
+        base_symbol = symbols_by_kind[kind]
+        base_width = lookup_type_parameter(base_symbol, 'width')
+        base_height = lookup_type_parameter(base_symbol, 'height')
+        if base_width is None or base_height is None or base_width.IsReadOnly or base_height.IsReadOnly:
+            continue  # dimensões de instância: mantém o tipo escolhido
+
+        name = type_name(base_symbol.Name, size.key)
+        symbol = existing.get((base_symbol.Family.Name, name))
+        if symbol is None:
+            symbol = base_symbol.Duplicate(name)
+            existing[(base_symbol.Family.Name, name)] = symbol
+            if timer is not None:
+                timer.count('opening_types_created')
+        elif timer is not None:
+            timer.count('opening_types_reused')
+
+        for key, value in (('width', size.width), ('height', size.height)):
+            param = lookup_type_parameter(symbol, key)
+            if abs(param.AsDouble() - value) > 1e-9:
+                param.Set(value)
+        if not symbol.IsActive:
+            symbol.Activate()
+        opening_types[size.key] = (symbol, size.width, size.height)
+    return opening_types
 
 
 ###############################################################
 # Criação de portas e janelas no Revit
 ###############################################################
-def create_openings_in_revit(doc, walls, wall_data, door_family_symbol, window_family_symbol, alley_family_symbol, created_element_ids, level):
+def create_openings_in_revit(doc, walls, opening_plan, door_family_symbol, window_family_symbol, alley_family_symbol, created_element_ids, levels, timer=None, resolver=None, opening_types=None):
     """
-    Cria portas e janelas (structure_type = 'Door' ou 'Window') em cada parede,
-    aplicando o mesmo método de rotação a ambas via quaternions.
+    Cria portas, janelas e passagens (structure_type = 'Door', 'Window' ou 'Alley')
+    nas paredes. Os pontos de inserção já vêm calculados em 'opening_plan'
+    (scanxml.openings.plan_openings), então aqui só há chamadas à API do Revit.
+    Se 'timer' (PhaseTimer) for informado, o tempo gasto ajustando parâmetros
+    é acumulado na fase 'parameters'.
+    Deve ser chamada com a transação aberta e os símbolos já ativados.
+    'levels' traz o nível de cada parede de 'walls'.
+    'resolver' (OpeningParameterResolver) pode ser compartilhado entre lotes.
+    'opening_types' (presize_opening_types) troca o símbolo pelo tipo já
+    dimensionado, cuja largura/altura dispensa a escrita na instância.
     """
-    # Ativa símbolos se necessário
-    def activate_family_symbol(fam_symbol):
-        if not fam_symbol.IsActive:
-            fam_symbol.Activate()
+    if resolver is None:
+        resolver = OpeningParameterResolver()
+
+    for wall_index, child, (x, y, z) in opening_plan:
+        wall = walls[wall_index]
+        level = levels[wall_index]  # Nível da parede hospedeira
+        structure_type = child.kind
+
+        # Dimensões (largura, altura, peitoril), já em pés
+        width = child.width
+        height = child.height
+
+        # Peitoril relativo ao nível hospedeiro (o parâmetro do Revit já é
+        # medido a partir do nível da instância)
+        parapet_val = None
+        if structure_type == 'Window' or structure_type == 'Door':
+            parapet_val = child.parapet
+
+        # Ponto de inserção e família
+        opening_point = XYZ(x, y, z)
+
+        if structure_type == 'Door':
+            family_symbol = door_family_symbol
+        elif structure_type == 'Window':  # Window
+            family_symbol = window_family_symbol
+        else:
+            family_symbol = alley_family_symbol
+
+        if opening_types:
+            presized = opening_types.get(size_key(child))
+            if presized is not None:
+                family_symbol, width, height = presized
+
+        opening_instance = doc.Create.NewFamilyInstance(
+            opening_point,
+            family_symbol,
+            wall,
+            Structure.StructuralType.NonStructural
+        )
+        created_element_ids.Add(opening_instance.Id)
+
+        # Ajustar parâmetros
+        params_start = timer.clock() if timer is not None else 0.0
+        resolver.set(opening_instance, family_symbol, 'width', width)
+        resolver.set(opening_instance, family_symbol, 'height', height)
+        if parapet_val is not None:
+            resolver.set(opening_instance, family_symbol, 'parapet', parapet_val)
+        resolver.set(opening_instance, family_symbol, 'level', level.Id)
+
+        if timer is not None:
+            timer.add('parameters', timer.clock() - params_start)
+            timer.count(structure_type.lower() + 's')
+
+
+###############################################################
+# Paredes e aberturas de um lote, dentro da transação aberta.
+# Cada etapa roda em uma SubTransaction: uma falha desfaz a etapa e é
+# repassada, fazendo o nó falhar (e o Dynamo desfazer a transação).
+# Retorna as paredes criadas.
+###############################################################
+def create_walls_and_openings(doc, lines, heights, opening_plan, levels, wall_types, symbols, created_element_ids, timer, regenerate, wall_tags=None, resolver=None, opening_types=None):
+    door_symbol, window_symbol, alley_symbol = symbols
+
+    with timer.phase('create_walls'):
+        walls = run_checkpoint(doc, create_walls_in_revit, doc, lines, levels, heights, wall_types, created_element_ids, wall_tags)
+
+    # Única regeneração do lote: paredes prontas para hospedar as aberturas
+    with timer.phase('regenerate'):
+        if regenerate or len(opening_plan) > 0:
             doc.Regenerate()
+            timer.count('regenerations')
 
-    activate_family_symbol(door_family_symbol)
-    activate_family_symbol(window_family_symbol)
-    activate_family_symbol(alley_family_symbol)
-    TransactionManager.Instance.EnsureInTransaction(doc)
+    with timer.phase('create_openings'):
+        run_checkpoint(doc, create_openings_in_revit, doc, walls, opening_plan, door_symbol, window_symbol, alley_symbol, created_element_ids, levels, timer, resolver, opening_types)
+    return walls
 
-    level_elevation = level.Elevation  # Elevação do nível selecionado
-
-    for wall, data in zip(walls, wall_data):
-        # 1) Obter origem e direção da parede
-        wall_curve = wall.Location.Curve
-        wall_transform = wall_curve.ComputeDerivatives(0.0, True)
-        wall_origin = wall_transform.Origin
-        wall_direction = wall_transform.BasisX
-
-        # 2) Calcular ângulo em relação ao eixo X global (rotação planar)
-        wall_rotation_angle = wall_direction.AngleTo(XYZ(1, 0, 0))
-        if wall_direction.Y < 0:
-            wall_rotation_angle = -wall_rotation_angle
-        
-        # 3) Converter a rotação da parede num quaternion "pai"
-        parent_quat = quaternion_from_angle_z(wall_rotation_angle)
-
-        # 4) Percorrer cada filho (porta ou janela)
-        for child in data.findall('child'):
-            structure_type = child.get('structure_type')
-            if structure_type not in ['Door','Window', 'Alley']:
-                continue
-            
-            # Dimensões (largura, altura, peitoril)
-            width = meters_to_feet(float(child.find('width').text))
-            height = meters_to_feet(float(child.find('height').text))
-
-            parapet_val = None
-            if structure_type == 'Window' or structure_type == 'Door':
-                parapet_elem = child.find('parapet')
-                if parapet_elem is not None:
-                    parapet_val = meters_to_feet(float(parapet_elem.text)) # adiciona a elevação do nível
-            
-            # Posição local no XML (em metros) => converter para pés
-            position_elem = child.find('position')
-            x = meters_to_feet(float(position_elem.get('x')))
-            y = meters_to_feet(float(position_elem.get('y')))
-            z = meters_to_feet(float(position_elem.get('z')))
-            local_point = XYZ(x, y, z)
-
-            # Rotação local (XML) em quaternion
-            rot_elem = child.find('rotation')
-            if rot_elem is not None:
-                w_rot = float(rot_elem.get('w'))
-                x_rot = float(rot_elem.get('x'))
-                y_rot = float(rot_elem.get('y'))
-                z_rot = float(rot_elem.get('z'))
-                child_quat = (w_rot, x_rot, y_rot, z_rot)
-            else:
-                # Se não houver rotação, assume quaternion identity
-                child_quat = (1.0, 0.0, 0.0, 0.0)
-
-            # 5) Combinar rotação do pai e do filho
-            global_quat = parent_quat #quaternion_multiply(parent_quat, child_quat)
-
-            # 6) Rotacionar o ponto local
-            #    Aqui, pivot = (0,0,0), pois consideramos "local_point" relativo à base da parede
-            rotated_local = apply_quaternion_rotation(local_point, XYZ(0,0,0), global_quat)
-
-            # 7) Determinar a posição global (transladando pela origem da parede)
-            global_x = wall_origin.X + rotated_local.X
-            global_y = wall_origin.Y + rotated_local.Y
-            global_z = wall_origin.Z + rotated_local.Z #Usa a elevação do nível diretamente, posiciona correto nos níveis
-
-            # 8) Ajuste de alinhamento (janelas, r/l/c)
-            if structure_type == 'Window':
-                alignment_elem = child.find('alignment')
-                alignment = alignment_elem.text.lower() if alignment_elem is not None else 'c'
-                
-                # Definindo offset local para "r","l","c"
-                half_width = width / 2.0
-                if alignment == 'r':
-                    # por ex.: mover -half_width no eixo X local
-                    offset_local = XYZ(half_width, 0, 0)
-                elif alignment == 'l':
-                    offset_local = XYZ(-half_width, 0, 0)
-                else:
-                    offset_local = XYZ(half_width, 0, 0)#XYZ(0, 0, 0)
-                
-                # Rotacionar esse offset_local pelo global_quat
-                offset_rotated = apply_quaternion_rotation(offset_local, XYZ(0,0,0), global_quat)
-                global_x += offset_rotated.X
-                global_y += offset_rotated.Y
-
-                # Ajusta a altura para posicionar a janela no meio
-                global_z = height / 2.0
-            
-            elif structure_type in ['Door', 'Alley']:
-                half_width = width / 2.0
-                # Se quiser aplicar offset similar pra portas
-                offset_local = XYZ(half_width, half_width, 0)
-                offset_rotated = apply_quaternion_rotation(offset_local, XYZ(0,0,0), global_quat)
-                global_x += offset_rotated.X
-                global_y += offset_rotated.Y
-                #global_z += offset_rotated.Z  # se necessário
-                #pass
-
-            # 9) Criar o ponto de inserção final e instanciar
-            opening_point = XYZ(global_x, global_y, global_z)
-            
-            if structure_type == 'Door':
-                family_symbol = door_family_symbol
-            elif structure_type == 'Window':  # Window
-                family_symbol = window_family_symbol
-            else:
-                family_symbol = alley_family_symbol
-
-            opening_instance = doc.Create.NewFamilyInstance(
-                opening_point,
-                family_symbol,
-                wall,
-                Structure.StructuralType.NonStructural
-            )
-            created_element_ids.Add(opening_instance.Id)
-
-            # 10) Ajustar parâmetros
-            param_width = opening_instance.LookupParameter("Largura")
-            if param_width:
-                param_width.Set(width)
-            
-            param_height = opening_instance.LookupParameter("Altura")
-            if param_height:
-                param_height.Set(height)
-            
-            if parapet_val is not None:
-                param_parapet = opening_instance.LookupParameter("Altura do peitoril")
-                if param_parapet:
-                    param_parapet.Set(parapet_val + float(level_elevation)) #+level.Elevation
-            
-            param_level = opening_instance.LookupParameter("Base Level")
-            if param_level and not param_level.IsReadOnly:
-                param_level.Set(level.Id)
 
-    TransactionManager.Instance.TransactionTaskDone()
+###############################################################
+# Criação em fluxo: consome os lotes do ScanProducer na thread do
+# Revit, com a transação aberta. Os tipos de parede e de abertura são
+# resolvidos só para as espessuras/tamanhos ainda não vistos.
+# Retorna o (início, fim) de cada parede.
+###############################################################
+def create_pipelined(doc, batches, level, wall_type, symbols, created_element_ids, timer):
+    lines = []
+    resolver = OpeningParameterResolver()
+    wall_types = {}
+    opening_types = {}
+    symbols_by_kind = dict(zip(('Door', 'Window', 'Alley'), symbols))
+
+    with timer.phase('activate'):
+        regenerate = activate_family_symbols(symbols)
+
+    for walls_batch, endpoints, opening_plan in batches:
+        batch_lines = list(endpoints)
+        lines.extend(batch_lines)
+
+        if WALL_TYPES_BY_THICKNESS:
+            with timer.phase('wall_types'):
+                missing = dict((key, thickness) for key, thickness in build_thickness_catalog(walls_batch).items()
+                               if key not in wall_types)
+                if missing:
+                    wall_types.update(run_checkpoint(doc, resolve_wall_types, doc, wall_type, missing, timer))
+        batch_wall_types = [wall_types.get(thickness_key(wall.thickness), wall_type) for wall in walls_batch]
+
+        if PRESIZE_OPENING_TYPES and len(opening_plan) > 0:
+            with timer.phase('opening_types'):
+                missing = [size for size in build_catalog(opening_plan) if size.key not in opening_types]
+                if missing:
+                    opening_types.update(run_checkpoint(doc, presize_opening_types, doc, symbols_by_kind, missing, timer))
+                    for size in missing:
+                        opening_types.setdefault(size.key, None)  # família sem dimensões de tipo
+
+        create_walls_and_openings(
+            doc, batch_lines, [wall.height for wall in walls_batch], opening_plan, [level] * len(walls_batch),
+            batch_wall_types, symbols, created_element_ids, timer, regenerate, None, resolver, opening_types)
+        regenerate = False
+        timer.count('walls', len(walls_batch))
+        timer.count('pipeline_batches')
+    return lines
 
 
 #####################################################################
@@ -348,83 +749,254 @@ wall_family_name = UnwrapElement(IN[2])
 door_family_name = UnwrapElement(IN[3])
 window_family_name = UnwrapElement(IN[4])
 alley_family_name  = UnwrapElement(IN[5])
-xml_data = parse_xml(file_path)
+timer = PhaseTimer()
 
 doc = DocumentManager.Instance.CurrentDBDocument
 
 lines = []
-points = []
 wall_data = []
 heights = []
 
 # Lista para armazenar todos os ElementIds criados
 created_element_ids = List[ElementId]()
 
-# Criando linhas a partir dos dados XML
-for wall in xml_data.findall('object[@structure_type="Wall"]'):
-    length = meters_to_feet(float(wall.find('length').text))
-    height = meters_to_feet(float(wall.find('height').text))
-    pos = wall.find('position')
-
-    # Leitura das coordenadas originais
-    x = meters_to_feet(float(pos.get('x')))
-    y = meters_to_feet(float(pos.get('y')))
-    z = meters_to_feet(float(pos.get('z')))
-
-    original_start_point = DSPoint.ByCoordinates(x, y, z)
-
-    rot = wall.find('rotation')
-
-    # Leitura dos quaternions originais
-    w = float(rot.get('w'))
-    x_rot = float(rot.get('x'))
-    y_rot = float(rot.get('y'))
-    z_rot = float(rot.get('z'))
-
-    rotation_quat = (w, x_rot, y_rot, z_rot)
-
-    # Transformação dos quaternions
-    rotation_quat = transform_quaternion(rotation_quat)
-
-    # Criar e transformar a linha
-    line_points = create_and_transform_line(original_start_point, length, rotation_quat)
-
-    line = DSLine.ByStartPointEndPoint(line_points[0], line_points[1])
-    lines.append(line)
-    points.append(line_points[0])
-    wall_data.append(wall)
-    heights.append(height)
-
-# Processar o nível
-level_info = str(level_info)
-level_name_match = re.search(r"Name=([^,]+),", level_info)
-if level_name_match:
-    level_name = level_name_match.group(1)
+# Um .scanplan é reproduzido direto do arquivo mapeado, lote a lote, quando
+# nada precisa do plano inteiro (vários pavimentos, sincronização, lotes com
+# retomada ou uma junção/união que o plano ainda não tenha)
+mapped_plan = None
+if file_path.lower().endswith(PLANFILE_SUFFIX) and not (MULTI_LEVEL or SYNC_MODE or CHUNK_SIZE > 0):
+    mapped_plan = MappedPlan(file_path)
+    if (SNAP_ENDPOINTS and not mapped_plan.snapped) or (MERGE_COLLINEAR_WALLS and not mapped_plan.merged):
+        mapped_plan.close()
+        mapped_plan = None
+
+progress = None
+if mapped_plan is not None:
+    # Reprodução do .scanplan: as linhas das tabelas mapeadas são
+    # decodificadas só quando o lote é criado
+    with timer.phase('level'):
+        level = LevelIndex(doc).resolve(level_info)
+    symbols = [door_family_name, window_family_name, alley_family_name]
+    TransactionManager.Instance.EnsureInTransaction(doc)
+    with mapped_plan:
+        lines = create_pipelined(doc, mapped_plan.iter_batches(PIPELINE_BATCH or 500, level.Elevation, timer.clock),
+                                 level, wall_family_name, symbols, created_element_ids, timer)
+    timer.add('parse', mapped_plan.decode_seconds)
+elif PIPELINE_BATCH > 0:
+    # Modo em fluxo: leitura em segundo plano e criação lote a lote
+    if SYNC_MODE:
+        raise ValueError("PIPELINE_BATCH não pode ser usado com SYNC_MODE.")
+    with timer.phase('level'):
+        level = LevelIndex(doc).resolve(level_info)
+    symbols = [door_family_name, window_family_name, alley_family_name]
+    producer = ScanProducer(file_path, PIPELINE_BATCH, PIPELINE_QUEUE, level.Elevation, timer.clock,
+                            XML_BACKEND).start()
+    TransactionManager.Instance.EnsureInTransaction(doc)
+    try:
+        lines = create_pipelined(doc, producer, level, wall_family_name, symbols, created_element_ids, timer)
+    finally:
+        producer.close()
+    timer.add('parse', producer.parse_seconds)
+    timer.add('pipeline_wait', producer.wait_seconds)
 else:
-    raise ValueError(f"Formato de nível inválido: {level_info}")
-
-levels = FilteredElementCollector(doc).OfClass(Level).ToElements()
-level = next((lvl for lvl in levels if lvl.Name == level_name), None)
-
-if level is None:
-    raise ValueError(f"Nível com nome '{level_name}' não encontrado.")
-
-# Criar paredes no Revit
-walls = create_walls_in_revit(doc, lines, level, heights, wall_family_name, created_element_ids)
+    # Leitura do XML (o gerador só é consumido aqui), do cache ou de um plano
+    # de construção gerado fora do Revit (python -m scanxml)
+    build_plan = None
+    with timer.phase('parse'):
+        if file_path.lower().endswith(PLANFILE_SUFFIX):
+            build_plan = load_planfile(file_path)
+            walls_xml, wall_endpoints, cache_hit = build_plan.walls, build_plan.endpoints, False
+        elif file_path.lower().endswith(PLAN_SUFFIX):
+            build_plan = load_plan(file_path)
+            walls_xml, wall_endpoints, cache_hit = build_plan.walls, build_plan.endpoints, False
+        elif USE_SCAN_CACHE:
+            walls_xml, wall_endpoints, cache_hit = load_scan_cached(file_path, XML_BACKEND, SHARD_WORKERS, SHARD_PYTHON)
+        elif SHARD_WORKERS > 0:
+            from scanxml.shards import parse_sharded
+            walls_xml, wall_endpoints = parse_sharded(file_path, SHARD_WORKERS, XML_BACKEND, python=SHARD_PYTHON)
+            cache_hit = False
+        else:
+            walls_xml, wall_endpoints, cache_hit = list(parse_xml(file_path)), None, False
+    timer.count('walls', len(walls_xml))
+    timer.count('cache_hit', int(cache_hit))
+
+    # Junção das extremidades em nós e união dos segmentos colineares
+    if SNAP_ENDPOINTS or MERGE_COLLINEAR_WALLS:
+        if wall_endpoints is None:
+            with timer.phase('lines'):
+                wall_endpoints = wall_endpoints_batch(walls_xml)
+    if SNAP_ENDPOINTS and not (build_plan is not None and build_plan.snapped):
+        with timer.phase('snap'):
+            wall_endpoints, wall_nodes = snap_endpoints(wall_endpoints)[:2]
+        timer.count('wall_nodes', len(wall_nodes))
+    if MERGE_COLLINEAR_WALLS and not (build_plan is not None and build_plan.merged):
+        with timer.phase('merge'):
+            walls_xml, wall_endpoints = merge_collinear_walls(walls_xml, wall_endpoints)
+        timer.count('merged_walls', len(walls_xml))
+
+    # Criando linhas a partir dos dados XML
+    with timer.phase('lines'):
+        if wall_endpoints is None:
+            wall_endpoints = wall_endpoints_batch(walls_xml)
+        for wall, (start, end) in zip(walls_xml, wall_endpoints):
+            # Linha base da parede, em floats (os objetos do Dynamo ficam
+            # só para a pré-visualização)
+            lines.append((start, end))
+            wall_data.append(wall)
+            heights.append(wall.height)
+
+    # Processar o nível
+    with timer.phase('level'):
+        level_index = LevelIndex(doc)
+        level = level_index.resolve(level_info)
+
+        # Pavimentos: cota de cada grupo de paredes e nível existente associado
+        storey_of_wall = [0] * len(wall_data)
+        storey_elevations = [level.Elevation]
+        storey_matches = [0]
+        storey_candidates = [level]
+        if MULTI_LEVEL:
+            if build_plan is not None:
+                storey_of_wall, storey_elevations = build_plan.storey_of_wall, build_plan.storey_elevations
+            else:
+                storey_of_wall, storey_elevations = partition_storeys(wall_endpoints)
+            storey_candidates = level_index.all()
+            storey_matches = match_levels(storey_elevations, [lvl.Elevation for lvl in storey_candidates])
+            storey_elevations = [elevation if match is None else storey_candidates[match].Elevation
+                                 for elevation, match in zip(storey_elevations, storey_matches)]
+            timer.count('storeys', len(storey_elevations))
+            timer.count('storeys_new_levels', storey_matches.count(None))
+
+    # Calcular os pontos de inserção de todas as aberturas antes das transações
+    with timer.phase('opening_plan'):
+        if MULTI_LEVEL:
+            opening_plan = plan_openings(wall_data, wall_endpoints, [storey_elevations[k] for k in storey_of_wall])
+        else:
+            opening_plan = plan_openings(wall_data, wall_endpoints, level.Elevation)
+
+    # Re-sincronização: só as paredes novas ou alteradas seguem para a criação
+    build_lines, build_heights, build_walls, build_storeys = lines, heights, wall_data, storey_of_wall
+    wall_tags = None
+    stale_wall_ids = []
+    if SYNC_MODE:
+        with timer.phase('sync'):
+            scope = scan_scope(file_path, level.Id.IntegerValue, SYNC_SCOPE)
+            existing_fingerprints, existing_ids = collect_scan_walls(doc, scope)
+            sync_plan = diff_scan(existing_fingerprints, wall_data, wall_endpoints)
+            stale_wall_ids = [existing_ids[key] for key in sync_plan.delete]
+
+            build = sync_plan.build
+            build_lines = [lines[i] for i in build]
+            build_heights = [heights[i] for i in build]
+            build_walls = [wall_data[i] for i in build]
+            build_storeys = [storey_of_wall[i] for i in build]
+            wall_tags = [make_tag(scope, sync_plan.keys[i], sync_plan.fingerprints[i]) for i in build]
+            opening_plan = opening_plan.for_walls(build)
+        for name, value in sync_plan.summary().items():
+            timer.count('sync_' + name, value)
+
+    # Divisão em lotes (um único lote quando CHUNK_SIZE = 0) e retomada
+    opening_counts = [0] * len(build_lines)
+    for wall_index, child, point in opening_plan:
+        opening_counts[wall_index] += 1
+    chunks = plan_chunks(opening_counts, CHUNK_SIZE)
+    if CHUNK_SIZE > 0:
+        progress = ChunkProgress.load(progress_path(file_path), file_digest(file_path), CHUNK_SIZE, len(build_lines))
+        for element_id in progress.element_ids:
+            # Ignora elementos que não existem mais (ex.: desfeitos no Revit)
+            if doc.GetElement(ElementId(element_id)) is not None:
+                created_element_ids.Add(ElementId(element_id))
+        timer.count('chunks', len(chunks))
+        timer.count('resumed_walls', progress.completed)
+
+    # A escrita acontece em uma única transação (ou uma por lote). Cada etapa
+    # roda em uma SubTransaction e o documento é regenerado no máximo uma vez
+    # por lote, entre a criação das paredes e a das aberturas.
+    symbols = [door_family_name, window_family_name, alley_family_name]
+    parameter_resolver = OpeningParameterResolver()
+    TransactionManager.Instance.EnsureInTransaction(doc)
 
-# Criar portas e janelas no Revit
-create_openings_in_revit(doc, walls, wall_data, door_family_name, window_family_name, alley_family_name, created_element_ids, level)
+    if stale_wall_ids:
+        with timer.phase('sync_delete'):
+            run_checkpoint(doc, delete_scan_walls, doc, stale_wall_ids)
+
+    # Ativar todos os símbolos de uma vez
+    with timer.phase('activate'):
+        symbols_activated = activate_family_symbols(symbols)
+
+    # Tipos pré-dimensionados por (largura, altura)
+    opening_types = None
+    if PRESIZE_OPENING_TYPES and len(opening_plan) > 0:
+        with timer.phase('opening_types'):
+            symbols_by_kind = dict(zip(('Door', 'Window', 'Alley'), symbols))
+            opening_types = run_checkpoint(doc, presize_opening_types, doc, symbols_by_kind, build_catalog(opening_plan), timer)
+
+    # Nível de cada parede a criar (cria os níveis dos pavimentos novos)
+    with timer.phase('levels'):
+        storey_levels = run_checkpoint(doc, create_storey_levels, doc, storey_elevations, storey_matches, storey_candidates)
+        build_wall_levels = [storey_levels[k] for k in build_storeys]
+
+    # Tipo de parede de cada parede a criar, por espessura
+    build_wall_types = [wall_family_name] * len(build_walls)
+    if WALL_TYPES_BY_THICKNESS and build_walls:
+        with timer.phase('wall_types'):
+            wall_types = run_checkpoint(doc, resolve_wall_types, doc, wall_family_name, build_thickness_catalog(build_walls), timer)
+            build_wall_types = [wall_types.get(thickness_key(wall.thickness), wall_family_name) for wall in build_walls]
+
+    for chunk_number, (start, stop) in enumerate(chunks, 1):
+        if progress is not None and stop <= progress.completed:
+            continue  # lote já confirmado em uma execução anterior
+
+        if (start, stop) == (0, len(build_lines)):
+            chunk_plan = opening_plan
+        else:
+            chunk_plan = opening_plan.for_walls(range(start, stop))
+        chunk_first_id = created_element_ids.Count
+        create_walls_and_openings(
+            doc, build_lines[start:stop], build_heights[start:stop], chunk_plan, build_wall_levels[start:stop],
+            build_wall_types[start:stop], symbols, created_element_ids, timer, symbols_activated,
+            wall_tags[start:stop] if wall_tags is not None else None, parameter_resolver, opening_types)
+        symbols_activated = False
+
+        if progress is not None:
+            # Confirma o lote (no Dynamo só ForceCloseTransaction confirma; o
+            # TransactionTaskDone deixa tudo para o fim da execução) e só então
+            # registra o progresso e abre a transação do próximo
+            with timer.phase('commit'):
+                TransactionManager.Instance.ForceCloseTransaction()
+            timer.count('chunks_committed')
+            progress.mark(stop, [created_element_ids[i].IntegerValue for i in range(chunk_first_id, created_element_ids.Count)])
+            if PROGRESS_CALLBACK is not None:
+                PROGRESS_CALLBACK(stop, len(build_lines), chunk_number, len(chunks))
+            TransactionManager.Instance.EnsureInTransaction(doc)
 
 # Agora, vamos agrupar todos os elementos criados usando a hora/minuto/segundo
-TransactionManager.Instance.EnsureInTransaction(doc)
-current_time = datetime.datetime.now()
-# Formato de nome de grupo com H_M_S
-group_name = "Grupo_{:02d}{:02d}{:02d}".format(current_time.hour, current_time.minute, current_time.second)
+# (no modo de sincronização os elementos ficam soltos, pois mudam a cada execução)
+with timer.phase('group'):
+    if not SYNC_MODE:
+        current_time = datetime.datetime.now()
+        # Formato de nome de grupo com H_M_S
+        group_name = "Grupo_{:02d}{:02d}{:02d}".format(current_time.hour, current_time.minute, current_time.second)
+
+        if created_element_ids.Count > 0:
+            new_group = doc.Create.NewGroup(created_element_ids)
+            new_group.GroupType.Name = group_name
+timer.count('elements', created_element_ids.Count)
+
+with timer.phase('commit'):
+    TransactionManager.Instance.TransactionTaskDone()
+if progress is not None:
+    progress.clear()
+
+# Geometria de pré-visualização do Dynamo (a partir das linhas em floats)
+with timer.phase('preview'):
+    preview_lines, preview_points = build_preview(lines, PREVIEW_MODE, PREVIEW_LIMIT, PREVIEW_JOIN_ROOMS)
+timer.count('preview_elements', len(preview_lines))
 
-if created_element_ids.Count > 0:
-    new_group = doc.Create.NewGroup(created_element_ids)
-    new_group.GroupType.Name = group_name
-TransactionManager.Instance.TransactionTaskDone()
+# Relatório de tempos por fase (e log JSON opcional ao lado do XML)
+timing_report = timer.report()
+if WRITE_TIMING_LOG:
+    write_timing_log(timing_report, file_path)
 
 # Output para visualização no Dynamo
-OUT = (lines, points, level.Elevation)
+OUT = (preview_lines, preview_points, level.Elevation, timing_report)
@@ -0,0 +1,146 @@
+"""
+Benchmark do pipeline do Scan2XML.py com arquivos sintéticos.
+
+Para cada tamanho gera um eoxObjects (benchmarks/synthetic.py) e cronometra
+separadamente:
+    parse     - leitura do XML (scanxml.reader.iter_walls)
+    geometry  - extremidades das paredes em floats (wall_endpoints_batch) e
+                pontos das aberturas (plan_openings); sem objetos do Dynamo
+    walls     - create_walls_in_revit com as APIs simuladas (revitmock)
+    openings  - create_openings_in_revit com as APIs simuladas
+
+Com --save grava os resultados em JSON; com --baseline compara a vazão
+(paredes/s) de cada fase com um JSON anterior e termina com código 1 se
+alguma fase ficar mais lenta que a tolerância.
+
+Uso:
+    python benchmarks/bench_pipeline.py [--sizes 10 1000 100000] [--save bench.json]
+    python benchmarks/bench_pipeline.py --baseline bench.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import revitmock  # noqa: E402
+from scanxml.openings import plan_openings  # noqa: E402
+from scanxml.reader import iter_walls  # noqa: E402
+from scanxml.vectorized import wall_endpoints_batch  # noqa: E402
+from synthetic import write_eox  # noqa: E402
+
+SCRIPT = os.path.join(ROOT, 'Scan2XML.py')
+PHASES = ('parse', 'geometry', 'walls', 'openings')
+
+
+def bench_file(xml_path, latency=None):
+    """Cronometra as fases do Scan2XML.py para um arquivo. Retorna dict."""
+    ns, recorder, doc = revitmock.load_definitions(SCRIPT, latency=latency)
+    inputs = ns['IN']
+    level = inputs[1].InternalElement
+    created = ns['List'][ns['ElementId']]()
+    timings = {}
+
+    t0 = time.perf_counter()
+    walls_xml = list(iter_walls(xml_path))
+    timings['parse'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    endpoints = wall_endpoints_batch(walls_xml)
+    lines = list(endpoints)
+    opening_plan = plan_openings(walls_xml, endpoints, level.Elevation)
+    timings['geometry'] = time.perf_counter() - t0
+
+    transaction_manager = ns['TransactionManager'].Instance
+    transaction_manager.EnsureInTransaction(doc)
+    ns['activate_family_symbols'](inputs[3:6])
+
+    t0 = time.perf_counter()
+    heights = [wall.height for wall in walls_xml]
+    walls = ns['create_walls_in_revit'](doc, lines, [level] * len(lines), heights, [inputs[2]] * len(lines), created)
+    timings['walls'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    doc.Regenerate()
+    ns['create_openings_in_revit'](doc, walls, opening_plan, inputs[3], inputs[4], inputs[5], created, [level] * len(walls))
+    timings['openings'] = time.perf_counter() - t0
+    transaction_manager.TransactionTaskDone()
+
+    return {
+        'walls': len(walls_xml),
+        'openings': len(opening_plan),
+        'seconds': timings,
+        'calls': recorder.summary(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Lista as fases cuja vazão caiu mais que 'tolerance' em relação ao baseline."""
+    regressions = []
+    for size, current in results.items():
+        previous = baseline.get(size)
+        if previous is None:
+            continue
+        for phase in PHASES:
+            old = previous['seconds'][phase]
+            new = current['seconds'][phase]
+            if old > 0 and new > old * (1.0 + tolerance):
+                regressions.append((size, phase, old, new))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='latência simulada (s) por Wall.Create/NewFamilyInstance')
+    parser.add_argument('--save', help='grava os resultados neste JSON')
+    parser.add_argument('--baseline', help='JSON de referência para detectar regressões')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    latency = None
+    if args.latency:
+        latency = {'Wall.Create': args.latency, 'Create.NewFamilyInstance': args.latency}
+
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='scanxml_bench_')
+    print("{:>8}{:>10}{:>12}{:>12}{:>12}{:>12}{:>14}".format(
+        'paredes', 'aberturas', 'parse', 'geometry', 'walls', 'openings', 'paredes/s'))
+    for size in args.sizes:
+        xml_path = write_eox(os.path.join(workdir, 'eox_{}.xml'.format(size)), size, args.seed)
+        result = bench_file(xml_path, latency)
+        os.remove(xml_path)
+        results[str(size)] = result
+        seconds = result['seconds']
+        total = sum(seconds.values())
+        print("{:>8}{:>10}{:>11.4f}s{:>11.4f}s{:>11.4f}s{:>11.4f}s{:>14.0f}".format(
+            result['walls'], result['openings'],
+            seconds['parse'], seconds['geometry'], seconds['walls'], seconds['openings'],
+            result['walls'] / total if total else 0.0))
+    os.rmdir(workdir)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for size, phase, old, new in regressions:
+            print("REGRESSÃO {} paredes, fase {}: {:.4f}s -> {:.4f}s".format(size, phase, old, new))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
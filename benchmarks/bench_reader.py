@@ -0,0 +1,126 @@
+"""
+Benchmark: leitura do XML com cada leitor de scanxml.reader.
+
+Gera um eoxObjects sintético (benchmarks/synthetic.py), lê o arquivo com
+cada backend disponível ('lxml' só se estiver instalado), confere que todos
+produzem exatamente os mesmos registros e mostra o tempo e a vazão. Antes,
+confere o mesmo em EDGE_CASES, um XML pequeno com as variações de marcação
+que o tokenizador 'regex' precisa tratar.
+
+Uso:
+    python benchmarks/bench_reader.py [paredes]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scanxml.model import OpeningRecord, WallRecord  # noqa: E402
+from scanxml.reader import BACKENDS, HAS_LXML, iter_walls  # noqa: E402
+from synthetic import write_eox  # noqa: E402
+
+
+# <object .../> vazio antes de uma parede, atributos com aspas simples e
+# espaços em volta do '=', comentário e <child .../> vazio
+EDGE_CASES = """<?xml version="1.0" encoding="utf-8"?>
+<eoxObjects>
+	<object structure_type="Marker"/>
+	<object structure_type="Wall">
+		<length>3.000000</length>
+		<height>2.500000</height>
+		<thickness>0.150000</thickness>
+		<position x="1.000000" y="0.000000" z="-2.000000" />
+		<rotation w="0.707107" x="0.000000" y="0.000000" z="0.707107" />
+		<child structure_type="Window">
+			<width>1.200000</width>
+			<height>1.000000</height>
+			<position x='0.500000' y='0.000000' z='0.075000' />
+			<parapet>0.900000</parapet>
+			<alignment>Right</alignment>
+		</child>
+	</object>
+	<!-- <object structure_type="Wall"> comentado </object> -->
+	<object structure_type = 'Marker' />
+	<object structure_type='Wall'>
+		<length>4.000000</length>
+		<height>2.800000</height>
+		<position x = '0.000000' y = '0.000000' z = '0.000000' />
+		<child structure_type='Door'>
+			<width>0.900000</width>
+			<height>2.100000</height>
+			<position x="1.000000" y="0.000000" z="0.000000" />
+			<rotation w='1.000000' x='0.000000' y='0.000000' z='0.000000' />
+		</child>
+		<child structure_type="Marker"/>
+	</object>
+	<object structure_type="Placeholder"><label>x</label></object>
+</eoxObjects>
+"""
+
+
+def _fields(record, cls):
+    return tuple(getattr(record, name) for name in cls.__slots__ if name != 'openings')
+
+
+def _signature(walls):
+    return [(_fields(wall, WallRecord), [_fields(o, OpeningRecord) for o in wall.openings]) for wall in walls]
+
+
+def run(xml_path, repeat=3):
+    """Retorna {backend: (melhor tempo em s, paredes, igual ao 'stdlib')}."""
+    backends = [name for name in BACKENDS if name != 'lxml' or HAS_LXML]
+    reference = None
+    results = {}
+    for name in backends:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            walls = list(iter_walls(xml_path, name))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        signature = _signature(walls)
+        if reference is None:
+            reference = signature
+        results[name] = (best, len(walls), signature == reference)
+    return results
+
+
+def check_edge_cases(tmp):
+    """Lê EDGE_CASES com cada leitor; True se todos dão os registros do 'stdlib'."""
+    path = os.path.join(tmp, 'edge.xml')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(EDGE_CASES)
+    results = run(path, repeat=1)
+    for name, (_, walls, same) in results.items():
+        print("{:<10}{:>10} paredes{:>10}".format(name, walls, 'sim' if same else 'NÃO'))
+    return all(same for _, _, same in results.values())
+
+
+def main(argv):
+    n_walls = int(argv[1]) if len(argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        print("Casos de marcação (EDGE_CASES)")
+        if not check_edge_cases(tmp):
+            return 1
+
+        xml_path = write_eox(os.path.join(tmp, 'scan.xml'), n_walls)
+        size_mb = os.path.getsize(xml_path) / 1e6
+        print("Leitura de {} paredes ({:.1f} MB){}".format(
+            n_walls, size_mb, '' if HAS_LXML else ' - lxml não instalado'))
+        print("{:<10}{:>10}{:>14}{:>10}{:>10}".format('leitor', 's', 'paredes/s', 'MB/s', 'igual'))
+        results = run(xml_path)
+        base = results['stdlib'][0]
+        for name, (seconds, walls, same) in results.items():
+            print("{:<10}{:>10.3f}{:>14.0f}{:>10.1f}{:>10}  {:.2f}x".format(
+                name, seconds, walls / seconds, size_mb / seconds, 'sim' if same else 'NÃO', base / seconds))
+        if not all(same for _, _, same in results.values()):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
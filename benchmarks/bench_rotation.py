@@ -0,0 +1,59 @@
+"""
+Benchmark: custo por ponto da rotação por quaternion.
+
+Compara o produto q * p * q^-1 (rotate_vector) com a matriz pré-calculada
+(Rotation.apply), para quaternions genéricos e para rotações puras em Y
+(caso das paredes do structureQP.xml). A última coluna monta a Rotation a
+cada ponto, como wall_endpoints faz para cada parede (cada uma tem o seu
+quaternion).
+
+Uso:
+    python benchmarks/bench_rotation.py [pontos]
+"""
+
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scanxml.geometry import Rotation, rotate_vector  # noqa: E402
+
+
+def _per_point_ns(stmt, n_points, repeat=5):
+    timer = timeit.Timer(stmt)
+    best = min(timer.repeat(repeat=repeat, number=1))
+    return best / n_points * 1e9
+
+
+def run(n_points=100000, seed=0):
+    rng = random.Random(seed)
+    vectors = [(rng.uniform(-10, 10), rng.uniform(-10, 10), rng.uniform(-10, 10)) for _ in range(n_points)]
+    angle = rng.uniform(-math.pi, math.pi)
+    cases = {
+        'generic': tuple(rng.uniform(-1, 1) for _ in range(4)),
+        'yaw': (math.cos(angle / 2.0), 0.0, math.sin(angle / 2.0), 0.0),
+    }
+
+    results = {}
+    for name, q in cases.items():
+        rotation = Rotation(q)
+        sandwich = _per_point_ns(lambda: [rotate_vector(v, q) for v in vectors], n_points)
+        cached = _per_point_ns(lambda: [rotation.apply(v) for v in vectors], n_points)
+        built = _per_point_ns(lambda: [Rotation(q).apply(v) for v in vectors], n_points)
+        results[name] = (sandwich, cached, built)
+    return results
+
+
+def main(argv):
+    n_points = int(argv[1]) if len(argv) > 1 else 100000
+    print("Rotação de {} pontos (ns por ponto)".format(n_points))
+    print("{:<10}{:>14}{:>14}{:>22}{:>10}".format('caso', 'q*p*q^-1', 'Rotation', 'Rotation(q) + apply', 'ganho'))
+    for name, (sandwich, cached, built) in run(n_points).items():
+        print("{:<10}{:>14.1f}{:>14.1f}{:>22.1f}{:>9.1f}x".format(name, sandwich, cached, built, sandwich / cached))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,102 @@
+"""
+Benchmark: leitura em fatias paralelas (scanxml.shards) com 1, 2, 4...
+processos.
+
+Gera um eoxObjects sintético (benchmarks/synthetic.py) e, para cada leitor,
+cronometra parse_sharded com cada número de processos. A linha de 1
+processo é a leitura serial (iter_walls + wall_endpoints_batch); as demais
+mostram o ganho sobre ela e conferem que paredes e extremidades são as
+mesmas da serial. O ganho medido só aparece com núcleos livres (o cabeçalho
+mostra quantas CPUs a máquina tem); a coluna 'estimado' é o ganho esperado
+com um núcleo livre por processo, a partir do tempo de cada fatia medido
+em sequência: a carga do processo mais ocupado (as fatias são distribuídas
+como no pool, sempre para o processo mais livre) mais a remontagem no
+processo principal, que é serial.
+
+Uso:
+    python benchmarks/bench_shards.py [paredes] [--workers 1 2 4] [--backends stdlib regex]
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_reader import _signature  # noqa: E402
+from scanxml.cache import unpack_scan  # noqa: E402
+from scanxml.reader import BACKENDS, HAS_LXML  # noqa: E402
+from scanxml.shards import SHARDS_PER_WORKER, parse_shard, parse_sharded, shard_ranges  # noqa: E402
+from synthetic import write_eox  # noqa: E402
+
+
+def run(xml_path, backend, workers, repeat=3):
+    """Retorna [(processos, melhor tempo em s, igual à leitura serial)]."""
+    reference = None
+    results = []
+    for n in workers:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            walls, endpoints = parse_sharded(xml_path, n, backend)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        signature = (_signature(walls), endpoints)
+        if reference is None:
+            reference = signature
+        results.append((n, best, signature == reference))
+    return results
+
+
+def estimate(xml_path, backend, workers):
+    """Ganho esperado com 'workers' núcleos livres (ver o cabeçalho do módulo)."""
+    ranges = shard_ranges(xml_path, workers * SHARDS_PER_WORKER)
+    if workers == 1 or len(ranges) <= 1:
+        return 1.0
+    first, tail = ranges[0][0], ranges[-1][1]
+    loads = [0.0] * min(workers, len(ranges))
+    total = merge = 0.0
+    for start, end in ranges:
+        t0 = time.perf_counter()
+        tables = pickle.dumps(parse_shard((xml_path, backend, first, tail, start, end)), -1)
+        t1 = time.perf_counter()
+        unpack_scan(*pickle.loads(tables))
+        merge += time.perf_counter() - t1
+        total += t1 - t0
+        loads[loads.index(min(loads))] += t1 - t0
+    return total / (max(loads) + merge)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Leitura em fatias com 1, 2, 4... processos.')
+    parser.add_argument('walls', type=int, nargs='?', default=100000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=['stdlib', 'regex'])
+    args = parser.parse_args(argv)
+    workers = [1] + [n for n in args.workers if n != 1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_path = write_eox(os.path.join(tmp, 'scan.xml'), args.walls)
+        print("Leitura em fatias de {} paredes ({:.1f} MB), {} CPUs".format(
+            args.walls, os.path.getsize(xml_path) / 1e6, os.cpu_count()))
+        print("{:<10}{:>10}{:>10}{:>10}{:>10}{:>10}".format('leitor', 'processos', 's', 'ganho', 'estimado', 'igual'))
+        ok = True
+        for backend in args.backends:
+            if backend == 'lxml' and not HAS_LXML:
+                continue
+            results = run(xml_path, backend, workers)
+            serial = results[0][1]
+            for n, seconds, same in results:
+                print("{:<10}{:>10}{:>10.3f}{:>9.2f}x{:>9.2f}x{:>10}".format(
+                    backend, n, seconds, serial / seconds, estimate(xml_path, backend, n),
+                    'sim' if same else 'NÃO'))
+                ok = ok and same
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Conferência: aberturas de um scan de dois pavimentos (MULTI_LEVEL).
+
+Gera um eoxObjects sintético com as paredes alternadas entre dois
+pavimentos (benchmarks/synthetic.py --storeys 2), executa o Scan2XML.py
+com MULTI_LEVEL = True nas APIs simuladas (revitmock) e confere, para cada
+porta, janela e passagem criada:
+    nível  - o nível da instância está na cota do pavimento da parede
+    z      - o ponto de inserção fica na cota do nível mais a altura local
+             (meia altura nas janelas, position z nas portas/passagens)
+    peitoril - o parâmetro recebe o <parapet> do XML, relativo ao nível
+Termina com código 1 se alguma abertura não conferir.
+
+Uso:
+    python benchmarks/check_multilevel.py [paredes]
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from revitmock.runner import run_script  # noqa: E402
+from scanxml.reader import iter_walls  # noqa: E402
+from synthetic import write_eox  # noqa: E402
+
+SCRIPT = os.path.join(ROOT, 'Scan2XML.py')
+TOLERANCE = 1e-6  # pés
+
+
+def _key(kind, width, height):
+    return (kind, round(width, 9), round(height, 9))
+
+
+def expected_openings(xml_path):
+    """{(tipo, largura, altura): (cota do pavimento, z local, peitoril)} a partir do XML."""
+    expected = {}
+    for wall in iter_walls(xml_path):
+        for opening in wall.openings:
+            local_z = opening.height / 2.0 if opening.kind == 'Window' else opening.z
+            parapet = opening.parapet if opening.kind in ('Door', 'Window') else None
+            expected[_key(opening.kind, opening.width, opening.height)] = (wall.y, local_z, parapet)
+    return expected
+
+
+def check(xml_path, script_path):
+    """Retorna ({cota do nível: aberturas}, [erros])."""
+    expected = expected_openings(xml_path)
+    out, recorder, doc = run_script(script_path, xml_path, extra_inputs=[ROOT])
+    kinds = {'Porta': 'Door', 'Janela': 'Window', 'Passagem': 'Alley'}
+    per_level = {}
+    errors = []
+    for element in list(doc.elements.values()):
+        if type(element).__name__ != 'FamilyInstance':
+            continue
+        family = element.Symbol.Family.Name
+        width = element.LookupParameter('Largura').AsDouble()
+        height = element.LookupParameter('Altura').AsDouble()
+        key = _key(kinds.get(family, family), width, height)
+        if key not in expected:
+            errors.append('{}: abertura sem correspondente no XML'.format(key))
+            continue
+        storey_z, local_z, parapet = expected[key]
+        level = doc.GetElement(element.LookupParameter('Base Level').AsElementId())
+        location = getattr(element.Location, 'Point', element.Location)
+        per_level[level.Elevation] = per_level.get(level.Elevation, 0) + 1
+        if abs(level.Elevation - storey_z) > TOLERANCE:
+            errors.append('{}: nível {:.4f}, pavimento {:.4f}'.format(key, level.Elevation, storey_z))
+        if abs(location.Z - (level.Elevation + local_z)) > TOLERANCE:
+            errors.append('{}: z {:.4f}, esperado {:.4f}'.format(key, location.Z, level.Elevation + local_z))
+        if parapet is not None:
+            sill = element.LookupParameter('Altura do peitoril').AsDouble()
+            if abs(sill - parapet) > TOLERANCE:
+                errors.append('{}: peitoril {:.4f}, esperado {:.4f}'.format(key, sill, parapet))
+    return per_level, errors
+
+
+def main(argv):
+    n_walls = int(argv[1]) if len(argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_path = write_eox(os.path.join(tmp, 'scan.xml'), n_walls, storeys=2)
+        with open(SCRIPT, encoding='utf-8') as f:
+            source = f.read()
+        script_path = os.path.join(tmp, 'Scan2XML.py')
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write(source.replace('MULTI_LEVEL = False', 'MULTI_LEVEL = True'))
+        per_level, errors = check(xml_path, script_path)
+
+    for elevation, count in sorted(per_level.items()):
+        print("nível {:>8.3f} pés: {:>5} aberturas".format(elevation, count))
+    for error in errors[:20]:
+        print(error)
+    if len(per_level) < 2:
+        print("esperados 2 pavimentos, encontrados {}".format(len(per_level)))
+        return 1
+    print("{} erros".format(len(errors)))
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,131 @@
+"""
+Gerador de arquivos eoxObjects sintéticos (formato do pcon.scan).
+
+Cria paredes com rotação aleatória em torno do eixo vertical, e nelas
+portas, janelas (com windowsashlist) e passagens, no mesmo layout do
+structureQP.xml. Com --storeys N, as paredes se alternam entre N
+pavimentos, STOREY_HEIGHT metros acima um do outro.
+
+Uso:
+    python benchmarks/synthetic.py saida.xml 1000 [--seed 0] [--storeys 1]
+"""
+
+import argparse
+import math
+import random
+
+HEADER = ('<?xml version="1.0" encoding="utf-8" standalone="no"?>\n'
+          '<eoxObjects xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+          'xsi:noNamespaceSchemaLocation="EOX_1.1-PRE4.xsd">\n')
+FOOTER = '</eoxObjects>\n'
+STOREY_HEIGHT = 2.8
+
+WALL = """\t<object structure_type="Wall">
+\t\t<category>Other</category>
+\t\t<length>{length:.6f}</length>
+\t\t<height>{height:.6f}</height>
+\t\t<thickness>{thickness:.6f}</thickness>
+\t\t<color_r b="1.0" g="1.0" r="1.0" />
+\t\t<color_l b="1.0" g="1.0" r="1.0" />
+\t\t<position x="{x:.6f}" y="{y:.6f}" z="{z:.6f}" />
+\t\t<rotation w="{w:.6f}" x="0.000000" y="0.000000" z="{qz:.6f}" />
+{children}\t</object>
+"""
+
+OPENING = """\t\t<child structure_type="{kind}">
+\t\t\t<category>Other</category>
+\t\t\t<orientation>inside</orientation>
+\t\t\t<width>{width:.6f}</width>
+\t\t\t<height>{height:.6f}</height>
+\t\t\t<position x="{x:.6f}" y="0.000000" z="{z:.6f}" />
+\t\t\t<rotation w="{w:.6f}" x="0.000000" y="{qy:.6f}" z="0.000000" />
+{extra}\t\t</child>
+"""
+
+WINDOW_EXTRA = """\t\t\t<parapet>{parapet:.6f}</parapet>
+\t\t\t<alignment>{alignment}</alignment>
+\t\t\t<centeroffset>0</centeroffset>
+\t\t\t<windowsashlist>
+{sashes}\t\t\t</windowsashlist>
+"""
+
+DOOR_EXTRA = """\t\t\t<parapet>0.000000</parapet>
+\t\t\t<alignment>c</alignment>
+"""
+
+PLACEHOLDER = """\t<object structure_type="Placeholder">
+\t\t<label>table</label>
+\t\t<layer>EGR_Scan_Objects</layer>
+\t\t<color b="0.7" g="0.7" r="0.7" />
+\t\t<position x="{x:.6f}" y="0.400000" z="{z:.6f}" />
+\t\t<rotation w="1.000000" x="0.000000" y="0.000000" z="0.000000" />
+\t\t<size x="1.000000" y="0.800000" z="0.600000" />
+\t</object>
+"""
+
+
+def _opening(rng, kind, wall_length, w, qz, thickness):
+    width = rng.uniform(0.6, min(1.8, max(0.7, wall_length * 0.6)))
+    x = rng.uniform(0.0, max(0.0, wall_length - width))
+    if kind == 'Window':
+        sashes = rng.choice((1, 2, 3))
+        extra = WINDOW_EXTRA.format(
+            parapet=rng.uniform(0.4, 1.1),
+            alignment=rng.choice('lrc'),
+            sashes=''.join('\t\t\t\t<windowsash width="{:.6f}" />\n'.format(width / sashes) for _ in range(sashes)),
+        )
+        height = rng.uniform(0.6, 1.6)
+    elif kind == 'Door':
+        extra = DOOR_EXTRA
+        height = rng.uniform(2.0, 2.2)
+    else:
+        extra = ''
+        height = rng.uniform(2.0, 2.4)
+    return OPENING.format(kind=kind, width=width, height=height, x=x, z=thickness / 2.0,
+                          w=w, qy=-qz, extra=extra)
+
+
+def iter_eox_chunks(n_walls, seed=0, doors=0.3, windows=0.4, alleys=0.05, placeholders=0.1, storeys=1):
+    """Gera o texto do XML em pedaços, uma parede (ou placeholder) por vez."""
+    rng = random.Random(seed)
+    yield HEADER
+    side = max(1, int(math.sqrt(n_walls)))
+    for i in range(n_walls):
+        # Paredes espalhadas em uma grade de ~5 m, com yaw aleatório
+        angle = rng.uniform(-math.pi, math.pi)
+        w, qz = math.cos(angle / 2.0), math.sin(angle / 2.0)
+        length = rng.uniform(0.5, 6.0)
+        thickness = rng.choice((0.12, 0.15, 0.24))
+        children = []
+        for kind, ratio in (('Door', doors), ('Window', windows), ('Alley', alleys)):
+            if rng.random() < ratio:
+                children.append(_opening(rng, kind, length, w, qz, thickness))
+        yield WALL.format(
+            length=length, height=rng.choice((2.5, 2.581186, 2.8)), thickness=thickness,
+            x=(i % side) * 5.0 + rng.uniform(-0.5, 0.5), y=(i % storeys) * STOREY_HEIGHT, z=-(i // side) * 5.0 + rng.uniform(-0.5, 0.5),
+            w=w, qz=qz, children=''.join(children),
+        )
+        if rng.random() < placeholders:
+            yield PLACEHOLDER.format(x=rng.uniform(-5, 5), z=rng.uniform(-5, 5))
+    yield FOOTER
+
+
+def write_eox(path, n_walls, seed=0, **ratios):
+    with open(path, 'w', encoding='utf-8') as f:
+        for chunk in iter_eox_chunks(n_walls, seed, **ratios):
+            f.write(chunk)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera um eoxObjects sintético.')
+    parser.add_argument('path')
+    parser.add_argument('walls', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--storeys', type=int, default=1)
+    args = parser.parse_args(argv)
+    write_eox(args.path, args.walls, args.seed, storeys=args.storeys)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+"""
+Simulação das APIs do Revit/Dynamo para rodar o Scan2XML.py em CPython.
+
+install() registra em sys.modules os módulos clr, System,
+Autodesk.DesignScript.Geometry, Autodesk.Revit.DB e RevitServices.*
+apontando para as classes simuladas deste pacote. run_script() executa o
+Scan2XML.py como o nó "Python Script From String" faria, com IN/OUT, e
+devolve o OUT e o registro de chamadas (CallRecorder).
+"""
+
+from . import db, dynamo, recorder
+from .recorder import CallRecorder, set_recorder
+from .runner import build_document, install, load_definitions, run_script
+
+__all__ = [
+    "CallRecorder",
+    "build_document",
+    "db",
+    "dynamo",
+    "install",
+    "load_definitions",
+    "recorder",
+    "run_script",
+    "set_recorder",
+]
@@ -0,0 +1,43 @@
+"""
+Executa um script Dynamo (ex.: Scan2XML.py) com as APIs simuladas.
+
+Uso:
+    python -m revitmock Scan2XML.py structureQP.xml [--latency 0.0005] [--profile]
+"""
+
+import argparse
+import cProfile
+import pstats
+
+from .runner import run_script
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='revitmock', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('script')
+    parser.add_argument('xml')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='latência simulada (s) por chamada de criação no Revit')
+    parser.add_argument('--profile', action='store_true', help='executa sob cProfile')
+    parser.add_argument('--top', type=int, default=25, help='linhas do relatório do cProfile')
+    args = parser.parse_args(argv)
+
+    latency = None
+    if args.latency:
+        latency = {name: args.latency for name in
+                   ('Wall.Create', 'Create.NewFamilyInstance', 'Parameter.Set', 'Document.Regenerate')}
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        out, recorder, doc = profiler.runcall(run_script, args.script, args.xml, latency=latency)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(args.top)
+    else:
+        out, recorder, doc = run_script(args.script, args.xml, latency=latency)
+
+    print("Elementos no documento: {}".format(len(doc.elements)))
+    for name, count in recorder.summary().items():
+        print("  {:<45}{:>8}".format(name, count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,525 @@
+"""
+Versão simulada do namespace Autodesk.Revit.DB.
+
+Implementa apenas o que o Scan2XML.py usa: XYZ, Line, ElementId, Level,
+Wall, FamilySymbol/FamilyInstance, Group, parâmetros e o
+FilteredElementCollector. Os elementos ficam registrados no FakeDocument.
+"""
+
+import math
+import zlib
+
+from . import recorder as _rec
+
+
+###############################################################
+# Geometria
+###############################################################
+class XYZ(object):
+    __slots__ = ('X', 'Y', 'Z')
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.X = float(x)
+        self.Y = float(y)
+        self.Z = float(z)
+
+    def __add__(self, other):
+        return XYZ(self.X + other.X, self.Y + other.Y, self.Z + other.Z)
+
+    def __sub__(self, other):
+        return XYZ(self.X - other.X, self.Y - other.Y, self.Z - other.Z)
+
+    def __mul__(self, k):
+        return XYZ(self.X * k, self.Y * k, self.Z * k)
+
+    def GetLength(self):
+        return math.sqrt(self.X * self.X + self.Y * self.Y + self.Z * self.Z)
+
+    def Normalize(self):
+        length = self.GetLength() or 1.0
+        return XYZ(self.X / length, self.Y / length, self.Z / length)
+
+    def DotProduct(self, other):
+        return self.X * other.X + self.Y * other.Y + self.Z * other.Z
+
+    def DistanceTo(self, other):
+        return (self - other).GetLength()
+
+    def AngleTo(self, other):
+        denom = self.GetLength() * other.GetLength()
+        if denom == 0.0:
+            return 0.0
+        return math.acos(max(-1.0, min(1.0, self.DotProduct(other) / denom)))
+
+    def IsAlmostEqualTo(self, other, tolerance=1e-9):
+        return self.DistanceTo(other) <= tolerance
+
+    def __repr__(self):
+        return "XYZ({:.6f}, {:.6f}, {:.6f})".format(self.X, self.Y, self.Z)
+
+
+class Transform(object):
+    def __init__(self, origin, basis_x):
+        self.Origin = origin
+        self.BasisX = basis_x
+
+
+class Line(object):
+    def __init__(self, start, end):
+        self._start = start
+        self._end = end
+
+    @staticmethod
+    def CreateBound(start, end):
+        _rec.record('Line.CreateBound')
+        if start.IsAlmostEqualTo(end, 1e-6):
+            raise ValueError("Curve length is too small for Revit's tolerance")
+        return Line(start, end)
+
+    def GetEndPoint(self, index):
+        return self._start if index == 0 else self._end
+
+    @property
+    def Length(self):
+        return self._start.DistanceTo(self._end)
+
+    def ComputeDerivatives(self, parameter, normalized):
+        return Transform(self._start, (self._end - self._start).Normalize())
+
+
+###############################################################
+# Elementos e parâmetros
+###############################################################
+class ElementId(object):
+    __slots__ = ('IntegerValue',)
+
+    def __init__(self, value):
+        if isinstance(value, str):
+            # ElementId(BuiltInParameter.X): id negativo, como no Revit
+            built_in = value
+            value = -(zlib.crc32(built_in.encode('utf-8')) & 0x7fffffff)
+            _BUILT_IN_IDS[value] = built_in
+        self.IntegerValue = int(value)
+
+    def __eq__(self, other):
+        return isinstance(other, ElementId) and other.IntegerValue == self.IntegerValue
+
+    def __hash__(self):
+        return hash(self.IntegerValue)
+
+    def __repr__(self):
+        return "ElementId({})".format(self.IntegerValue)
+
+
+_BUILT_IN_IDS = {}
+ElementId.InvalidElementId = ElementId(-1)
+
+
+class Definition(object):
+    def __init__(self, name):
+        self.Name = name
+
+
+class Parameter(object):
+    def __init__(self, name, value=None, read_only=False):
+        self.Definition = Definition(name)
+        self.IsReadOnly = read_only
+        self._value = value
+
+    def Set(self, value):
+        _rec.record('Parameter.Set', self.Definition.Name)
+        if self.IsReadOnly:
+            return False
+        self._value = value
+        return True
+
+    def AsDouble(self):
+        return float(self._value or 0.0)
+
+    def AsElementId(self):
+        return self._value
+
+    def AsString(self):
+        return None if self._value is None else str(self._value)
+
+    def AsValueString(self):
+        return self.AsString()
+
+
+class BuiltInParameter(object):
+    """Parâmetros nativos, mapeados para o nome do parâmetro simulado."""
+    ALL_MODEL_INSTANCE_COMMENTS = 'Comments'
+    DATUM_TEXT = 'Name'
+    FAMILY_WIDTH_PARAM = 'Width'
+    FAMILY_HEIGHT_PARAM = 'Height'
+    INSTANCE_SILL_HEIGHT_PARAM = 'Sill Height'
+    FAMILY_LEVEL_PARAM = 'Level'
+    WALL_USER_HEIGHT_PARAM = 'Unconnected Height'
+    WALL_BASE_OFFSET = 'Base Offset'
+
+
+class Element(object):
+    def __init__(self, doc=None, name=''):
+        self.Document = doc
+        self.Name = name
+        self.Id = doc.register(self) if doc is not None else ElementId(-1)
+        self._parameters = {}
+
+    def add_parameter(self, name, value=None, read_only=False):
+        self._parameters[name] = Parameter(name, value, read_only)
+        return self._parameters[name]
+
+    def LookupParameter(self, name):
+        _rec.record('Element.LookupParameter', name)
+        return self._parameters.get(name)
+
+    def get_Parameter(self, handle):
+        """Aceita um BuiltInParameter (nome simulado) ou uma Definition."""
+        _rec.record('Element.get_Parameter')
+        if isinstance(handle, Definition):
+            handle = handle.Name
+        return self._parameters.get(handle)
+
+    @property
+    def Parameters(self):
+        return list(self._parameters.values())
+
+
+class Level(Element):
+    def __init__(self, doc, name, elevation=0.0):
+        Element.__init__(self, doc, name)
+        self.Elevation = float(elevation)
+
+    @property
+    def Name(self):
+        return self._name
+
+    @Name.setter
+    def Name(self, name):
+        # Como no Revit, dois níveis não podem ter o mesmo nome
+        doc = self.Document
+        if doc is not None:
+            for element in doc.elements.values():
+                if isinstance(element, Level) and element is not self and element.Name == name:
+                    raise ValueError("Já existe um nível com o nome '{}'".format(name))
+        self._name = name
+
+    @staticmethod
+    def Create(doc, elevation):
+        _rec.record('Level.Create')
+        doc.require_transaction('Level.Create')
+        return Level(doc, 'Nível {}'.format(len(doc.elements)), elevation)
+
+
+class ElementType(Element):
+    def Duplicate(self, name):
+        """Cópia do tipo com outro nome e os mesmos parâmetros."""
+        _rec.record('ElementType.Duplicate')
+        self.Document.require_transaction('Duplicate')
+        copy = self.__class__.__new__(self.__class__)
+        copy.__dict__.update(self.__dict__)
+        Element.__init__(copy, self.Document, name)
+        for param in self.Parameters:
+            copy.add_parameter(param.Definition.Name, param._value, param.IsReadOnly)
+        if hasattr(copy, 'IsActive'):
+            copy.IsActive = False
+        return copy
+
+
+class CompoundStructure(object):
+    """Camadas de um tipo de parede (só as larguras); a camada 0 é o núcleo."""
+
+    def __init__(self, widths):
+        self._widths = list(widths)
+
+    def GetFirstCoreLayerIndex(self):
+        return 0
+
+    def GetLayerWidth(self, index):
+        return self._widths[index]
+
+    def SetLayerWidth(self, index, width):
+        _rec.record('CompoundStructure.SetLayerWidth')
+        self._widths[index] = float(width)
+
+    def GetWidth(self):
+        return sum(self._widths)
+
+
+class WallType(ElementType):
+    def __init__(self, doc, name, width=0.0):
+        ElementType.__init__(self, doc, name)
+        self.Width = float(width)
+        self._structure = CompoundStructure([self.Width])
+
+    def GetCompoundStructure(self):
+        return CompoundStructure(self._structure._widths)
+
+    def SetCompoundStructure(self, structure):
+        _rec.record('WallType.SetCompoundStructure')
+        self.Document.require_transaction('SetCompoundStructure')
+        self._structure = CompoundStructure(structure._widths)
+        self.Width = structure.GetWidth()
+
+
+class Family(Element):
+    pass
+
+
+class FamilySymbol(ElementType):
+    def __init__(self, doc, name, family_name='', parameters=None):
+        ElementType.__init__(self, doc, name)
+        self.Family = Family(None, family_name)
+        self.IsActive = False
+        for key, value in (parameters or {}).items():
+            self.add_parameter(key, value)
+
+    def Activate(self):
+        _rec.record('FamilySymbol.Activate')
+        self.IsActive = True
+
+
+class LocationCurve(object):
+    def __init__(self, curve):
+        self.Curve = curve
+
+
+class Wall(Element):
+    def __init__(self, doc, curve, wall_type_id, level_id, height, offset):
+        Element.__init__(self, doc, 'Wall')
+        self.WallType = doc.GetElement(wall_type_id)
+        self.LevelId = level_id
+        level = doc.GetElement(level_id)
+        base_z = level.Elevation + offset if level is not None else offset
+        # Revit projeta a linha de locação na elevação do nível
+        start = curve.GetEndPoint(0)
+        end = curve.GetEndPoint(1)
+        self.Location = LocationCurve(Line(XYZ(start.X, start.Y, base_z), XYZ(end.X, end.Y, base_z)))
+        self.add_parameter('Unconnected Height', height)
+        self.add_parameter('Base Offset', offset)
+        self.add_parameter('Comments', None)
+
+    @staticmethod
+    def Create(doc, curve, wall_type_id, level_id, height, offset, flip, structural):
+        _rec.record('Wall.Create')
+        doc.require_transaction('Wall.Create')
+        return Wall(doc, curve, wall_type_id, level_id, height, offset)
+
+
+class FamilyInstance(Element):
+    def __init__(self, doc, location, symbol, host):
+        Element.__init__(self, doc, symbol.Name)
+        self.Symbol = symbol
+        self.Host = host
+        self.Location = location
+        # Parâmetros de instância herdam o valor do tipo
+        for param in symbol.Parameters:
+            self.add_parameter(param.Definition.Name, param._value)
+        for name in ('Largura', 'Altura', 'Altura do peitoril'):
+            if name not in self._parameters:
+                self.add_parameter(name, 0.0)
+        self.add_parameter('Base Level', None)
+        self.add_parameter('Comments', None)
+
+
+class GroupType(Element):
+    pass
+
+
+class Group(Element):
+    def __init__(self, doc, member_ids):
+        Element.__init__(self, doc, 'Group')
+        self.GroupType = GroupType(doc, 'Group')
+        self.MemberIds = list(member_ids)
+
+
+class Structure(object):
+    class StructuralType(object):
+        NonStructural = 'NonStructural'
+
+
+###############################################################
+# Filtros por parâmetro
+###############################################################
+class FilterStringRule(object):
+    def __init__(self, parameter_id, value, case_sensitive):
+        self.parameter_name = _BUILT_IN_IDS.get(parameter_id.IntegerValue)
+        self.value = value
+        self.case_sensitive = case_sensitive
+
+    def matches(self, element):
+        if self.parameter_name == 'Name':
+            text = element.Name  # DATUM_TEXT acompanha o nome do elemento
+        else:
+            param = element._parameters.get(self.parameter_name)
+            text = param.AsString() if param is not None else None
+        if text is None:
+            return False
+        if self.case_sensitive:
+            return text == self.value
+        return text.lower() == self.value.lower()
+
+
+class ParameterFilterRuleFactory(object):
+    @staticmethod
+    def CreateEqualsRule(parameter_id, value, *removed):
+        # Como nas versões recentes do Revit: a sobrecarga com
+        # caseSensitive (obsoleta desde 2023) não existe mais
+        if removed:
+            raise TypeError("No method matches given arguments for CreateEqualsRule")
+        return FilterStringRule(parameter_id, value, True)
+
+
+class ElementParameterFilter(object):
+    def __init__(self, rule):
+        self._rule = rule
+
+    def passes(self, element):
+        return self._rule.matches(element)
+
+
+###############################################################
+# Coletor de elementos
+###############################################################
+class FilteredElementCollector(object):
+    def __init__(self, doc):
+        _rec.record('FilteredElementCollector')
+        self._elements = list(doc.elements.values())
+
+    def OfClass(self, cls):
+        self._elements = [e for e in self._elements if isinstance(e, cls)]
+        return self
+
+    def WhereElementIsElementType(self):
+        self._elements = [e for e in self._elements if isinstance(e, ElementType)]
+        return self
+
+    def WherePasses(self, element_filter):
+        self._elements = [e for e in self._elements if element_filter.passes(e)]
+        return self
+
+    def FirstElement(self):
+        return self._elements[0] if self._elements else None
+
+    def ToElements(self):
+        return list(self._elements)
+
+    def __iter__(self):
+        return iter(self._elements)
+
+
+###############################################################
+# Transações
+###############################################################
+class TransactionStatus(object):
+    Uninitialized = 'Uninitialized'
+    Started = 'Started'
+    Committed = 'Committed'
+    RolledBack = 'RolledBack'
+
+
+class SubTransaction(object):
+    """Ponto de restauração dentro da transação aberta pelo TransactionManager."""
+
+    def __init__(self, doc):
+        self._doc = doc
+        self._snapshot = None
+        self._status = TransactionStatus.Uninitialized
+
+    def Start(self):
+        _rec.record('SubTransaction.Start')
+        self._doc.require_transaction('SubTransaction.Start')
+        self._snapshot = dict(self._doc.elements)
+        self._status = TransactionStatus.Started
+        return self._status
+
+    def Commit(self):
+        _rec.record('SubTransaction.Commit')
+        self._snapshot = None
+        self._status = TransactionStatus.Committed
+        return self._status
+
+    def RollBack(self):
+        _rec.record('SubTransaction.RollBack')
+        # Restaura o conjunto de elementos (não desfaz mudanças de parâmetros)
+        self._doc.elements = self._snapshot
+        self._snapshot = None
+        self._status = TransactionStatus.RolledBack
+        return self._status
+
+    def GetStatus(self):
+        return self._status
+
+
+###############################################################
+# Documento
+###############################################################
+class _DocumentCreate(object):
+    def __init__(self, doc):
+        self._doc = doc
+
+    def NewFamilyInstance(self, location, symbol, host, structural_type):
+        _rec.record('Create.NewFamilyInstance')
+        self._doc.require_transaction('NewFamilyInstance')
+        if not symbol.IsActive:
+            raise RuntimeError("FamilySymbol '{}' não está ativo".format(symbol.Name))
+        return FamilyInstance(self._doc, location, symbol, host)
+
+    def NewGroup(self, element_ids):
+        _rec.record('Create.NewGroup')
+        self._doc.require_transaction('NewGroup')
+        return Group(self._doc, element_ids)
+
+
+class FakeDocument(object):
+    """Documento do Revit em memória: registra elementos e a transação aberta."""
+
+    def __init__(self, title='Projeto'):
+        self.Title = title
+        self.elements = {}
+        self._next_id = 1000
+        self.Create = _DocumentCreate(self)
+        self.transaction_open = False
+
+    def register(self, element):
+        self._next_id += 1
+        element_id = ElementId(self._next_id)
+        self.elements[element_id.IntegerValue] = element
+        return element_id
+
+    def GetElement(self, element_id):
+        if element_id is None:
+            return None
+        return self.elements.get(element_id.IntegerValue)
+
+    def Delete(self, element_ids):
+        _rec.record('Document.Delete')
+        self.require_transaction('Delete')
+        if isinstance(element_ids, ElementId):
+            element_ids = [element_ids]
+        deleted = set(e.IntegerValue for e in element_ids)
+        # Como no Revit, apagar o hospedeiro apaga as instâncias hospedadas
+        for element_id, element in list(self.elements.items()):
+            host = getattr(element, 'Host', None)
+            if host is not None and host.Id.IntegerValue in deleted:
+                deleted.add(element_id)
+        for element_id in deleted:
+            self.elements.pop(element_id, None)
+        return [ElementId(value) for value in sorted(deleted)]
+
+    def Regenerate(self):
+        _rec.record('Document.Regenerate')
+
+    def require_transaction(self, operation):
+        if not self.transaction_open:
+            raise RuntimeError("{} fora de uma transação".format(operation))
+
+    # Fábricas para montar o documento de teste
+    def add_level(self, name, elevation=0.0):
+        return Level(self, name, elevation)
+
+    def add_wall_type(self, name, width=0.0):
+        return WallType(self, name, width)
+
+    def add_family_symbol(self, name, family_name='', parameters=None):
+        return FamilySymbol(self, name, family_name, parameters)
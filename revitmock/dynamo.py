@@ -0,0 +1,179 @@
+"""
+Versões simuladas dos módulos do Dynamo usados pelo Scan2XML.py:
+ProtoGeometry (Point/Line), RevitServices (DocumentManager,
+TransactionManager), System.Collections.Generic.List e clr.
+"""
+
+import math
+
+from . import recorder as _rec
+
+
+###############################################################
+# Autodesk.DesignScript.Geometry
+###############################################################
+class Point(object):
+    __slots__ = ('X', 'Y', 'Z')
+
+    def __init__(self, x, y, z):
+        self.X = x
+        self.Y = y
+        self.Z = z
+
+    @staticmethod
+    def ByCoordinates(x, y, z=0.0):
+        _rec.record('DSPoint.ByCoordinates')
+        return Point(float(x), float(y), float(z))
+
+    def __repr__(self):
+        return "Point(X = {:.3f}, Y = {:.3f}, Z = {:.3f})".format(self.X, self.Y, self.Z)
+
+
+class Line(object):
+    def __init__(self, start, end):
+        self.StartPoint = start
+        self.EndPoint = end
+
+    @staticmethod
+    def ByStartPointEndPoint(start, end):
+        _rec.record('DSLine.ByStartPointEndPoint')
+        return Line(start, end)
+
+    @property
+    def Length(self):
+        return math.sqrt((self.EndPoint.X - self.StartPoint.X) ** 2
+                         + (self.EndPoint.Y - self.StartPoint.Y) ** 2
+                         + (self.EndPoint.Z - self.StartPoint.Z) ** 2)
+
+
+class PolyCurve(object):
+    def __init__(self, curves):
+        self.Curves = list(curves)
+
+    @staticmethod
+    def ByJoinedCurves(curves, *args):
+        _rec.record('DSPolyCurve.ByJoinedCurves')
+        return PolyCurve(curves)
+
+
+###############################################################
+# RevitServices
+###############################################################
+class _ActiveUIDocument(object):
+    def __init__(self, doc):
+        self.Document = doc
+
+
+class _UIApplication(object):
+    def __init__(self, doc):
+        self.ActiveUIDocument = _ActiveUIDocument(doc)
+
+
+class DocumentManager(object):
+    Instance = None
+
+    def __init__(self, doc):
+        self.CurrentDBDocument = doc
+        self.CurrentUIApplication = _UIApplication(doc)
+
+
+class TransactionManager(object):
+    """
+    Como no Dynamo (AutomaticTransactionStrategy): EnsureInTransaction abre
+    uma transação, TransactionTaskDone só encerra a tarefa (não confirma
+    nada) e apenas ForceCloseTransaction confirma. O que ficar aberto é
+    confirmado ao final da execução do nó, ou desfeito se ele falhar
+    (end_run, chamado pelo runner).
+    """
+
+    Instance = None
+
+    def __init__(self):
+        self._doc = None
+        self._snapshot = None
+
+    def EnsureInTransaction(self, doc):
+        _rec.record('TransactionManager.EnsureInTransaction')
+        if not doc.transaction_open:
+            _rec.record('Transaction.Start')
+            doc.transaction_open = True
+            self._snapshot = dict(doc.elements)
+        self._doc = doc
+
+    def TransactionTaskDone(self):
+        _rec.record('TransactionManager.TransactionTaskDone')
+
+    def ForceCloseTransaction(self):
+        _rec.record('TransactionManager.ForceCloseTransaction')
+        self._commit()
+
+    def _commit(self):
+        if self._doc is not None and self._doc.transaction_open:
+            _rec.record('Transaction.Commit')
+            self._doc.transaction_open = False
+            self._snapshot = None
+
+    def end_run(self, failed=False):
+        """Fim da execução do nó: confirma a transação aberta ou a desfaz."""
+        if self._doc is None or not self._doc.transaction_open:
+            return
+        if failed:
+            _rec.record('Transaction.RollBack')
+            self._doc.elements = self._snapshot
+            self._doc.transaction_open = False
+            self._snapshot = None
+        else:
+            self._commit()
+
+
+###############################################################
+# System.Collections.Generic
+###############################################################
+class _TypedList(list):
+    def Add(self, item):
+        self.append(item)
+
+    def RemoveRange(self, index, count):
+        del self[index:index + count]
+
+    @property
+    def Count(self):
+        return len(self)
+
+
+class _GenericList(object):
+    def __getitem__(self, item_type):
+        return _TypedList
+
+
+List = _GenericList()
+
+
+###############################################################
+# clr e wrappers do Dynamo
+###############################################################
+class _Clr(object):
+    def __init__(self):
+        self.references = []
+
+    def AddReference(self, name):
+        self.references.append(name)
+
+
+clr = _Clr()
+
+
+class DynamoLevel(object):
+    """Wrapper do Dynamo para um Level (str() igual ao do Revit.Elements.Level)."""
+
+    def __init__(self, level):
+        self.InternalElement = level
+        self.Name = level.Name
+        self.Elevation = level.Elevation
+
+    def __str__(self):
+        return "Level(Name={}, Elevation={})".format(self.Name, self.Elevation)
+
+
+def UnwrapElement(item):
+    return getattr(item, 'InternalElement', item)
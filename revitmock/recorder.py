@@ -0,0 +1,56 @@
+"""
+Registro das chamadas feitas às APIs simuladas do Revit/Dynamo.
+
+Cada chamada é contada por nome (ex.: "Wall.Create") e pode receber uma
+latência artificial, para aproximar o custo real das chamadas no Revit.
+"""
+
+import time
+from collections import Counter
+
+
+class CallRecorder(object):
+    """
+    Contador de chamadas com latência opcional por nome.
+
+    latency: dicionário {nome: segundos}; a chave "*" vale para todas as
+    chamadas sem entrada própria. keep_calls guarda também os argumentos.
+    """
+
+    def __init__(self, latency=None, keep_calls=False):
+        self.latency = dict(latency or {})
+        self.keep_calls = keep_calls
+        self.counts = Counter()
+        self.calls = []
+        self.simulated_time = 0.0
+
+    def record(self, name, *args):
+        self.counts[name] += 1
+        if self.keep_calls:
+            self.calls.append((name, args))
+        delay = self.latency.get(name, self.latency.get('*', 0.0))
+        if delay:
+            self.simulated_time += delay
+            time.sleep(delay)
+
+    def reset(self):
+        self.counts.clear()
+        del self.calls[:]
+        self.simulated_time = 0.0
+
+    def summary(self):
+        return dict(sorted(self.counts.items()))
+
+
+# Registro ativo, usado por todas as classes simuladas
+recorder = CallRecorder()
+
+
+def set_recorder(new_recorder):
+    global recorder
+    recorder = new_recorder
+    return recorder
+
+
+def record(name, *args):
+    recorder.record(name, *args)
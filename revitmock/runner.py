@@ -0,0 +1,131 @@
+"""
+Execução do Scan2XML.py fora do Revit.
+
+Exemplo:
+    python -m revitmock Scan2XML.py structureQP.xml --profile
+"""
+
+import os
+import sys
+import types
+
+from . import db, dynamo
+from .recorder import CallRecorder, set_recorder
+
+DB_NAMES = [name for name in dir(db) if not name.startswith('_') and name not in ('math',)]
+
+
+###############################################################
+# Registro dos módulos simulados em sys.modules
+###############################################################
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+def install():
+    """Registra os módulos simulados (idempotente)."""
+    db_module = _module('Autodesk.Revit.DB', **{name: getattr(db, name) for name in DB_NAMES})
+    db_module.__all__ = DB_NAMES
+    generic = _module('System.Collections.Generic', List=dynamo.List)
+    geometry = _module('Autodesk.DesignScript.Geometry',
+                       Point=dynamo.Point, Line=dynamo.Line, PolyCurve=dynamo.PolyCurve)
+    modules = {
+        'clr': dynamo.clr,
+        'System': _module('System', Collections=_module('System.Collections', Generic=generic)),
+        'System.Collections': _module('System.Collections', Generic=generic),
+        'System.Collections.Generic': generic,
+        'Autodesk': _module('Autodesk'),
+        'Autodesk.DesignScript': _module('Autodesk.DesignScript', Geometry=geometry),
+        'Autodesk.DesignScript.Geometry': geometry,
+        'Autodesk.Revit': _module('Autodesk.Revit', DB=db_module),
+        'Autodesk.Revit.DB': db_module,
+        'RevitServices': _module('RevitServices'),
+        'RevitServices.Persistence': _module('RevitServices.Persistence', DocumentManager=dynamo.DocumentManager),
+        'RevitServices.Transactions': _module('RevitServices.Transactions', TransactionManager=dynamo.TransactionManager),
+    }
+    sys.modules.update(modules)
+    return modules
+
+
+###############################################################
+# Documento de teste e execução do script
+###############################################################
+def build_document(level_name='Nível 1', elevation=0.0, wall_width=0.24 * 3.28084):
+    """
+    Cria um FakeDocument com um nível, um tipo de parede e os tipos de
+    porta, janela e passagem. Retorna (doc, inputs) com IN[1]..IN[5].
+    """
+    doc = db.FakeDocument()
+    level = doc.add_level(level_name, elevation)
+    wall_type = doc.add_wall_type('Parede Genérica', wall_width)
+    door = doc.add_family_symbol('Porta 0.80x2.10', 'Porta', {'Largura': 2.6, 'Altura': 6.9})
+    window = doc.add_family_symbol('Janela 1.20x1.00', 'Janela', {'Largura': 3.9, 'Altura': 3.3})
+    alley = doc.add_family_symbol('Passagem', 'Passagem', {'Largura': 2.6, 'Altura': 6.9})
+    inputs = [dynamo.DynamoLevel(level), wall_type, door, window, alley]
+    return doc, inputs
+
+
+MAIN_MARKER = '# A partir daqui, executamos a lógica principal do script'
+
+
+def _prepare(doc, latency):
+    install()
+    call_recorder = set_recorder(CallRecorder(latency))
+    dynamo.DocumentManager.Instance = dynamo.DocumentManager(doc)
+    dynamo.TransactionManager.Instance = dynamo.TransactionManager()
+    return call_recorder
+
+
+def _namespace(script_path, xml_path, inputs, extra_inputs):
+    return {
+        '__name__': '__main__',
+        '__file__': script_path,
+        'IN': [xml_path] + list(inputs) + list(extra_inputs),
+        'UnwrapElement': dynamo.UnwrapElement,
+    }
+
+
+def load_definitions(script_path, doc=None, inputs=None, latency=None):
+    """
+    Executa apenas as definições do script (até MAIN_MARKER), sem a lógica
+    principal, e retorna (namespace, recorder, doc). Usado pelos benchmarks
+    para cronometrar create_walls_in_revit etc. separadamente.
+    """
+    if doc is None:
+        doc, inputs = build_document()
+    call_recorder = _prepare(doc, latency)
+    script_path = os.path.abspath(script_path)
+    with open(script_path, encoding='utf-8') as f:
+        source = f.read()
+    if MAIN_MARKER in source:
+        source = source[:source.index(MAIN_MARKER)]
+    namespace = _namespace(script_path, None, inputs, ())
+    exec(compile(source, script_path, 'exec'), namespace)
+    return namespace, call_recorder, doc
+
+
+def run_script(script_path, xml_path, doc=None, inputs=None, latency=None, extra_inputs=()):
+    """
+    Executa o script Dynamo em script_path contra o documento simulado.
+
+    Retorna (OUT, recorder, doc). latency é repassado ao CallRecorder
+    ({nome da chamada: segundos}).
+    """
+    if doc is None:
+        doc, inputs = build_document()
+    call_recorder = _prepare(doc, latency)
+
+    script_path = os.path.abspath(script_path)
+    with open(script_path, encoding='utf-8') as f:
+        source = f.read()
+    namespace = _namespace(script_path, xml_path, inputs, extra_inputs)
+    try:
+        exec(compile(source, script_path, 'exec'), namespace)
+    except Exception:
+        # Como o Dynamo: a transação ainda aberta é desfeita se o nó falhar
+        dynamo.TransactionManager.Instance.end_run(failed=True)
+        raise
+    dynamo.TransactionManager.Instance.end_run()
+    return namespace.get('OUT'), call_recorder, doc
@@ -0,0 +1,19 @@
+"""
+Pacote de apoio ao Scan2XML.py.
+
+Contém a parte do pipeline que não depende do Revit/Dynamo (leitura do XML
+do pcon.scan, registros de paredes/aberturas e cálculos de geometria),
+podendo ser importado em qualquer CPython sem `clr`.
+"""
+
+from .geometry import meters_to_feet, wall_endpoints
+from .model import OpeningRecord, WallRecord
+from .reader import iter_walls
+
+__all__ = [
+    "OpeningRecord",
+    "WallRecord",
+    "iter_walls",
+    "meters_to_feet",
+    "wall_endpoints",
+]
@@ -0,0 +1,43 @@
+"""
+Converte uma pasta de XMLs do pcon.scan em planos de construção (.scanplan).
+
+Uso:
+    python -m scanxml pasta_dos_scans [--out planos] [--workers 4] [--json] [--backend regex] [--shard]
+"""
+
+import argparse
+import sys
+
+from .batch import convert_directory
+from .reader import BACKENDS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='scanxml', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('folder')
+    parser.add_argument('--out', help='pasta de saída (padrão: ao lado de cada XML)')
+    parser.add_argument('--workers', type=int, default=None, help='processos do pool (padrão: nº de CPUs)')
+    parser.add_argument('--pattern', default='*.xml')
+    parser.add_argument('--snap', action='store_true', help='junta as extremidades em nós (SNAP_ENDPOINTS)')
+    parser.add_argument('--merge', action='store_true', help='une paredes colineares (MERGE_COLLINEAR_WALLS)')
+    parser.add_argument('--json', action='store_true', help='grava .plan.json em vez do binário .scanplan')
+    parser.add_argument('--backend', choices=BACKENDS, default='stdlib', help='leitor do XML (scanxml.reader)')
+    parser.add_argument('--shard', action='store_true',
+                        help='um arquivo por vez, cada um lido em fatias pelos --workers processos')
+    args = parser.parse_args(argv)
+
+    results = convert_directory(args.folder, args.out, args.workers,
+                                args.snap, args.merge, args.pattern, not args.json,
+                                args.backend, args.shard)
+    failures = 0
+    for xml_path, n_walls, n_openings, seconds, error in results:
+        if error is not None:
+            failures += 1
+            print("{:<50} ERRO: {}".format(xml_path, error))
+        else:
+            print("{:<50}{:>8} paredes{:>8} aberturas{:>10.3f}s".format(xml_path, n_walls, n_openings, seconds))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
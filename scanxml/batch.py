@@ -0,0 +1,75 @@
+"""
+Conversão em lote de uma pasta de XMLs do pcon.scan em planos de construção.
+
+Cada arquivo é lido, transformado e preparado (scanxml.plan) em um processo
+separado do pool (ou, com shard, lido em fatias paralelas por scanxml.shards)
+e o plano é gravado como <nome>.scanplan (binário, scanxml.planfile) ou
+<nome>.plan.json.
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .plan import PLAN_SUFFIX, plan_path, prepare_plan, save_plan
+from .planfile import PLANFILE_SUFFIX, save_planfile
+from .reader import iter_walls
+from .shards import parse_sharded
+from .vectorized import wall_endpoints_batch
+
+
+###############################################################
+# Um arquivo (executado em um processo do pool)
+###############################################################
+def convert_file(job):
+    """
+    job = (xml_path, out_path, snap, merge, backend, shard_workers). O formato
+    segue a extensão de out_path (.scanplan ou .plan.json); com
+    shard_workers > 0 o XML é lido em fatias paralelas (scanxml.shards).
+    Retorna (xml_path, paredes, aberturas, segundos, erro); erro é None
+    quando a conversão funciona.
+    """
+    xml_path, out_path, snap, merge, backend, shard_workers = job
+    start = time.perf_counter()
+    try:
+        if shard_workers > 0:
+            walls, endpoints = parse_sharded(xml_path, shard_workers, backend)
+        else:
+            walls = list(iter_walls(xml_path, backend))
+            endpoints = wall_endpoints_batch(walls)
+        plan = prepare_plan(walls, endpoints, snap, merge,
+                            source=os.path.basename(xml_path))
+        if out_path.endswith(PLANFILE_SUFFIX):
+            save_planfile(out_path, plan)
+        else:
+            save_plan(out_path, plan)
+    except Exception as e:
+        return xml_path, 0, 0, time.perf_counter() - start, str(e)
+    n_openings = sum(len(wall.openings) for wall in plan.walls)
+    return xml_path, len(plan.walls), n_openings, time.perf_counter() - start, None
+
+
+###############################################################
+# Pasta inteira
+###############################################################
+def convert_directory(folder, out_dir=None, workers=None, snap=False, merge=False, pattern='*.xml',
+                      binary=True, backend='stdlib', shard=False):
+    """
+    Converte todos os XMLs de 'folder'; retorna os resultados de convert_file.
+    Com shard, os arquivos são convertidos um de cada vez, cada um lido em
+    fatias por 'workers' processos (melhor para poucos XMLs muito grandes).
+    """
+    xml_paths = sorted(glob.glob(os.path.join(folder, pattern)))
+    if out_dir and not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    suffix = PLANFILE_SUFFIX if binary else PLAN_SUFFIX
+    jobs = [(path, plan_path(path, out_dir, suffix), snap, merge, backend,
+             (workers or os.cpu_count() or 1) if shard else 0)
+            for path in xml_paths]
+    if shard:
+        return [convert_file(job) for job in jobs]
+    if workers == 1 or len(jobs) <= 1:
+        return [convert_file(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(convert_file, jobs))
@@ -0,0 +1,190 @@
+"""
+Cache em disco do scan já decodificado.
+
+O Dynamo reexecuta o nó Python sempre que qualquer entrada muda (nível,
+tipo de parede, famílias), mesmo com o XML intacto. Este módulo grava, ao
+lado do XML, um arquivo binário compacto (<xml>.scancache) com os
+WallRecord/OpeningRecord e as extremidades das paredes já calculadas, e o
+reaproveita enquanto o conteúdo do XML (hash SHA-1) e CACHE_VERSION forem
+os mesmos. Assim a reexecução não lê o XML nem refaz a matemática dos
+quaternions.
+
+Layout (little/big-endian nativo, registrado no cabeçalho):
+    cabeçalho   HEADER (magic, versão, byteorder, sha1, n paredes, n aberturas)
+    paredes     n_walls * WALL_FIELDS doubles
+    contagens   n_walls uint32 (aberturas por parede)
+    aberturas   n_openings * OPENING_FIELDS doubles (peitoril ausente = NaN)
+    tipos       n_openings bytes (D/W/A)
+    alinhamento uint32 com o tamanho + textos UTF-8 separados por NUL
+                (o <alignment> exatamente como lido, ex.: 'l' ou 'left')
+"""
+
+import hashlib
+import math
+import os
+import struct
+import sys
+from array import array
+
+from .model import OpeningRecord, WallRecord
+from .reader import iter_walls
+from .vectorized import wall_endpoints_batch
+
+# Incrementar quando a decodificação ou a geometria mudarem
+CACHE_VERSION = 2
+CACHE_SUFFIX = '.scancache'
+
+MAGIC = b'SCANXMLC'
+HEADER = struct.Struct('<8sIc40sII')
+WALL_FIELDS = 16    # length, height, thickness, x, y, z, qw, qx, qy, qz, início (3), fim (3)
+OPENING_FIELDS = 10  # width, height, parapet, x, y, z, qw, qx, qy, qz
+
+KIND_CODES = {'Door': b'D', 'Window': b'W', 'Alley': b'A'}
+KIND_NAMES = dict((code[0], name) for name, code in KIND_CODES.items())
+BYTEORDER = b'<' if sys.byteorder == 'little' else b'>'
+
+
+###############################################################
+# Chave do cache
+###############################################################
+def file_digest(path, block_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(xml_path):
+    return xml_path + CACHE_SUFFIX
+
+
+###############################################################
+# Gravação e leitura
+###############################################################
+def pack_scan(walls, endpoints):
+    """
+    Tabelas compactas do scan, no layout do arquivo: (wall_values, counts,
+    opening_values, kinds, alignment_text). Também é o formato em que as
+    fatias de scanxml.shards voltam dos processos.
+    """
+    wall_values = array('d')
+    counts = array('I')
+    opening_values = array('d')
+    kinds = bytearray()
+    alignments = []
+    for wall, (start, end) in zip(walls, endpoints):
+        wall_values.extend((wall.length, wall.height, wall.thickness,
+                            wall.x, wall.y, wall.z, wall.qw, wall.qx, wall.qy, wall.qz))
+        wall_values.extend(start)
+        wall_values.extend(end)
+        counts.append(len(wall.openings))
+        for opening in wall.openings:
+            parapet = float('nan') if opening.parapet is None else opening.parapet
+            opening_values.extend((opening.width, opening.height, parapet,
+                                   opening.x, opening.y, opening.z,
+                                   opening.qw, opening.qx, opening.qy, opening.qz))
+            kinds += KIND_CODES[opening.kind]
+            alignments.append(opening.alignment)
+    return wall_values, counts, opening_values, bytes(kinds), '\0'.join(alignments).encode('utf-8')
+
+
+def unpack_scan(wall_values, counts, opening_values, kinds, alignment_text):
+    """Inverso de pack_scan: retorna (walls, endpoints)."""
+    alignments = alignment_text.decode('utf-8').split('\0') if kinds else []
+    walls = []
+    endpoints = []
+    k = 0
+    for i in range(len(counts)):
+        v = wall_values[i * WALL_FIELDS:(i + 1) * WALL_FIELDS]
+        openings = []
+        for _ in range(counts[i]):
+            o = opening_values[k * OPENING_FIELDS:(k + 1) * OPENING_FIELDS]
+            parapet = None if math.isnan(o[2]) else o[2]
+            openings.append(OpeningRecord(KIND_NAMES[kinds[k]], o[0], o[1], parapet,
+                                          alignments[k], o[3], o[4], o[5], o[6], o[7], o[8], o[9]))
+            k += 1
+        walls.append(WallRecord(v[0], v[1], v[2], v[3], v[4], v[5], v[6], v[7], v[8], v[9], tuple(openings)))
+        endpoints.append((tuple(v[10:13]), tuple(v[13:16])))
+    return walls, endpoints
+
+
+def save_cache(path, digest, walls, endpoints):
+    wall_values, counts, opening_values, kinds, alignment_text = pack_scan(walls, endpoints)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, CACHE_VERSION, BYTEORDER, digest.encode('ascii'),
+                            len(counts), len(kinds)))
+        wall_values.tofile(f)
+        counts.tofile(f)
+        opening_values.tofile(f)
+        f.write(kinds)
+        f.write(struct.pack('<I', len(alignment_text)))
+        f.write(alignment_text)
+    os.replace(tmp_path, path)
+
+
+def load_cache(path, digest):
+    """Retorna (walls, endpoints) ou None se o cache não existir ou não servir."""
+    try:
+        f = open(path, 'rb')
+    except (IOError, OSError):
+        return None
+    with f:
+        header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            return None
+        magic, version, byteorder, stored_digest, n_walls, n_openings = HEADER.unpack(header)
+        if (magic != MAGIC or version != CACHE_VERSION or byteorder != BYTEORDER
+                or stored_digest.decode('ascii') != digest):
+            return None
+        try:
+            wall_values = array('d')
+            wall_values.fromfile(f, n_walls * WALL_FIELDS)
+            counts = array('I')
+            counts.fromfile(f, n_walls)
+            opening_values = array('d')
+            opening_values.fromfile(f, n_openings * OPENING_FIELDS)
+        except EOFError:
+            return None
+        kinds = f.read(n_openings)
+        size = f.read(4)
+        if len(kinds) != n_openings or len(size) != 4:
+            return None
+        alignment_text = f.read(struct.unpack('<I', size)[0])
+        if n_openings and alignment_text.count(b'\0') != n_openings - 1:
+            return None
+    return unpack_scan(wall_values, counts, opening_values, kinds, alignment_text)
+
+
+###############################################################
+# Ponto de entrada usado pelo Scan2XML.py
+###############################################################
+def load_scan_cached(xml_path, backend='stdlib', workers=0, python=None):
+    """
+    Retorna (walls, endpoints, cache_hit). Em caso de falta, lê o XML,
+    calcula as extremidades e grava o cache (falhas de escrita, como uma
+    pasta somente leitura, são ignoradas). 'backend' é o leitor de
+    scanxml.reader; com workers > 0, a leitura é feita em fatias paralelas
+    (scanxml.shards) com o mesmo leitor, em processos do executável 'python'
+    (padrão: o atual). Todos geram o mesmo cache.
+    """
+    digest = file_digest(xml_path)
+    path = cache_path(xml_path)
+    cached = load_cache(path, digest)
+    if cached is not None:
+        walls, endpoints = cached
+        return walls, endpoints, True
+
+    if workers > 0:
+        # Importado só aqui: concurrent.futures não existe no IronPython
+        from .shards import parse_sharded
+        walls, endpoints = parse_sharded(xml_path, workers, backend, python=python)
+    else:
+        walls = list(iter_walls(xml_path, backend))
+        endpoints = wall_endpoints_batch(walls)
+    try:
+        save_cache(path, digest, walls, endpoints)
+    except (IOError, OSError):
+        pass
+    return walls, endpoints, False
@@ -0,0 +1,86 @@
+"""
+Catálogo de tamanhos das aberturas para pré-dimensionar os tipos de família.
+
+Em vez de escrever largura e altura em cada instância, as aberturas do scan
+são agrupadas por (tipo, largura, altura) arredondadas para SIZE_TOLERANCE e
+cada grupo recebe um FamilySymbol próprio, duplicado uma única vez do tipo
+escolhido no Dynamo. Assim N escritas de parâmetros viram K tipos criados.
+"""
+
+from .geometry import FEET_PER_METER
+
+SIZE_TOLERANCE = 0.01 * FEET_PER_METER  # 1 cm, em pés
+
+
+###############################################################
+# Agrupamento por tamanho
+###############################################################
+def size_key(opening, tolerance=SIZE_TOLERANCE):
+    """Chave (tipo, largura, altura) com as dimensões em múltiplos de 'tolerance'."""
+    return (opening.kind,
+            int(round(opening.width / tolerance)),
+            int(round(opening.height / tolerance)))
+
+
+def type_name(base_name, key, tolerance=SIZE_TOLERANCE):
+    """Nome do tipo pré-dimensionado, com as dimensões em centímetros."""
+    kind, w, h = key
+    width_cm = int(round(w * tolerance / FEET_PER_METER * 100))
+    height_cm = int(round(h * tolerance / FEET_PER_METER * 100))
+    return '{} {}x{}'.format(base_name, width_cm, height_cm)
+
+
+class OpeningSize(object):
+    """Um grupo do catálogo: dimensões representativas (pés) e nº de aberturas."""
+
+    __slots__ = ('key', 'width', 'height', 'count')
+
+    def __init__(self, key, tolerance=SIZE_TOLERANCE):
+        self.key = key
+        self.width = key[1] * tolerance
+        self.height = key[2] * tolerance
+        self.count = 0
+
+
+def build_catalog(openings, tolerance=SIZE_TOLERANCE):
+    """
+    Agrupa as aberturas (OpeningRecord ou tuplas de um OpeningBatch).
+    Retorna a lista de OpeningSize, em ordem de primeira ocorrência.
+    """
+    sizes = {}
+    for opening in openings:
+        if isinstance(opening, tuple):
+            opening = opening[1]
+        key = size_key(opening, tolerance)
+        size = sizes.get(key)
+        if size is None:
+            size = sizes[key] = OpeningSize(key, tolerance)
+        size.count += 1
+    return list(sizes.values())
+
+
+###############################################################
+# Agrupamento das paredes por espessura
+###############################################################
+THICKNESS_TOLERANCE = 0.005 * FEET_PER_METER  # 5 mm, em pés
+
+
+def thickness_key(thickness, tolerance=THICKNESS_TOLERANCE):
+    """Espessura em múltiplos de 'tolerance'; None quando o XML não a informa."""
+    key = int(round(thickness / tolerance))
+    return key if key > 0 else None
+
+
+def wall_type_name(base_name, key, tolerance=THICKNESS_TOLERANCE):
+    """Nome do tipo de parede por espessura, em milímetros."""
+    return '{} {}mm'.format(base_name, int(round(key * tolerance / FEET_PER_METER * 1000)))
+
+
+def build_thickness_catalog(walls, tolerance=THICKNESS_TOLERANCE):
+    """Retorna {chave: espessura em pés} das espessuras distintas das paredes."""
+    thicknesses = {}
+    for wall in walls:
+        key = thickness_key(wall.thickness, tolerance)
+        if key is not None and key not in thicknesses:
+            thicknesses[key] = key * tolerance
+    return thicknesses
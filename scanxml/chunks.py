@@ -0,0 +1,102 @@
+"""
+Divisão da criação em lotes (chunks) com retomada.
+
+Em scans muito grandes, uma única transação segura toda a pilha de desfazer
+do Revit e uma falha na parede 40.000 perde tudo. Aqui as paredes são
+divididas em trechos consecutivos de até chunk_size elementos (parede +
+aberturas hospedadas, que ficam sempre no mesmo lote da parede) e o
+progresso de cada lote confirmado é gravado em um arquivo ao lado do XML
+(<xml>.progress.json), permitindo retomar do último lote confirmado.
+"""
+
+import json
+import os
+
+PROGRESS_SUFFIX = '.progress.json'
+
+
+###############################################################
+# Divisão em lotes
+###############################################################
+def plan_chunks(opening_counts, chunk_size):
+    """
+    Divide as paredes 0..n-1 em intervalos (início, fim) consecutivos com no
+    máximo chunk_size elementos (paredes + aberturas). Um lote tem sempre
+    pelo menos uma parede, mesmo que ela sozinha passe do limite.
+    """
+    n = len(opening_counts)
+    if chunk_size <= 0:
+        return [(0, n)] if n else []
+    chunks = []
+    start = 0
+    size = 0
+    for i, count in enumerate(opening_counts):
+        elements = 1 + count
+        if size and size + elements > chunk_size:
+            chunks.append((start, i))
+            start = i
+            size = 0
+        size += elements
+    if start < n:
+        chunks.append((start, n))
+    return chunks
+
+
+###############################################################
+# Arquivo de progresso
+###############################################################
+def progress_path(xml_path):
+    return xml_path + PROGRESS_SUFFIX
+
+
+class ChunkProgress(object):
+    """
+    Progresso de uma importação em lotes.
+
+    completed é o número de paredes (na ordem do scan) já confirmadas e
+    element_ids os ElementId (inteiros) criados por esses lotes.
+    """
+
+    def __init__(self, path, digest, chunk_size, total, completed=0, element_ids=None):
+        self.path = path
+        self.digest = digest
+        self.chunk_size = chunk_size
+        self.total = total
+        self.completed = completed
+        self.element_ids = list(element_ids or [])
+
+    @classmethod
+    def load(cls, path, digest, chunk_size, total):
+        """Retoma o progresso gravado se for do mesmo XML e da mesma divisão."""
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return cls(path, digest, chunk_size, total)
+        if (data.get('digest') != digest or data.get('chunk_size') != chunk_size
+                or data.get('total') != total):
+            return cls(path, digest, chunk_size, total)
+        return cls(path, digest, chunk_size, total, data.get('completed', 0), data.get('element_ids'))
+
+    def mark(self, completed, element_ids):
+        """Registra um lote confirmado e grava o arquivo."""
+        self.completed = completed
+        self.element_ids.extend(element_ids)
+        data = {
+            'digest': self.digest,
+            'chunk_size': self.chunk_size,
+            'total': self.total,
+            'completed': self.completed,
+            'element_ids': self.element_ids,
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Remove o arquivo após a importação terminar."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,122 @@
+"""
+Cálculos de geometria do scan em floats puros (sem DSPoint/XYZ).
+
+Mesma matemática usada no Scan2XML.py: rotação por quaternion (q * p * q^-1),
+troca de eixos do sistema do XML para o do Revit/Dynamo e conversão de
+metros para pés.
+
+Rotation guarda a matriz equivalente a um quaternion, calculada uma única vez
+por parede. Cada parede do scan tem o seu próprio quaternion, então a
+matriz é montada direto, sem cache: uma busca por quaternion quase sempre
+falharia e custaria mais que a própria construção.
+"""
+
+import math
+
+FEET_PER_METER = 3.28084
+IDENTITY_QUATERNION = (1.0, 0.0, 0.0, 0.0)
+
+
+###############################################################
+# Função para converter metros para pés
+###############################################################
+def meters_to_feet(meters):
+    return meters * FEET_PER_METER
+
+
+###############################################################
+# Auxiliares para rotação de pontos
+###############################################################
+def quaternion_multiply(q1, q2):
+    w1, x1, y1, z1 = q1
+    w2, x2, y2, z2 = q2
+    w = w1*w2 - x1*x2 - y1*y2 - z1*z2
+    x = w1*x2 + x1*w2 + y1*z2 - z1*y2
+    y = w1*y2 - x1*z2 + y1*w2 + z1*x2
+    z = w1*z2 + x1*y2 - y1*x2 + z1*w2
+    return (w, x, y, z)
+
+
+def quaternion_conjugate(q):
+    w, x, y, z = q
+    return (w, -x, -y, -z)
+
+
+def quaternion_from_angle_z(angle):
+    half = angle / 2.0
+    return (math.cos(half), 0.0, 0.0, math.sin(half))
+
+
+def rotate_vector(v, q):
+    """Rotaciona o vetor v = (x, y, z) pelo quaternion q (w, x, y, z)."""
+    p = (0.0, v[0], v[1], v[2])
+    rotated_p = quaternion_multiply(quaternion_multiply(q, p), quaternion_conjugate(q))
+    return (rotated_p[1], rotated_p[2], rotated_p[3])
+
+
+###############################################################
+# Rotação pré-calculada
+###############################################################
+class Rotation(object):
+    """
+    Matriz 3x3 equivalente a q * p * q^-1 para um quaternion q fixo.
+
+    Usa a forma homogênea (w² + x² - y² - z² na diagonal), que dá o mesmo
+    resultado do produto de quaternions mesmo com |q| != 1. Quando q é uma
+    rotação pura em torno do eixo Y (caso das paredes do pcon.scan depois de
+    transform_quaternion), guarda apenas o par (cos, sin) e o fator de escala.
+    """
+
+    __slots__ = ('matrix', 'yaw')
+
+    def __init__(self, q):
+        w, x, y, z = q
+        ww, xx, yy, zz = w*w, x*x, y*y, z*z
+        if x == 0.0 and z == 0.0:
+            self.matrix = None
+            self.yaw = (ww - yy, 2.0*w*y, ww + yy)
+            return
+        self.yaw = None
+        self.matrix = (
+            (ww + xx - yy - zz, 2.0*(x*y - w*z), 2.0*(x*z + w*y)),
+            (2.0*(x*y + w*z), ww - xx + yy - zz, 2.0*(y*z - w*x)),
+            (2.0*(x*z - w*y), 2.0*(y*z + w*x), ww - xx - yy + zz),
+        )
+
+    def apply(self, v):
+        vx, vy, vz = v
+        if self.yaw is not None:
+            c, s, k = self.yaw
+            return (c*vx + s*vz, k*vy, c*vz - s*vx)
+        (a, b, c), (d, e, f), (g, h, i) = self.matrix
+        return (a*vx + b*vy + c*vz, d*vx + e*vy + f*vz, g*vx + h*vy + i*vz)
+
+
+###############################################################
+# Transformações do sistema XML para o sistema Dynamo/Revit
+###############################################################
+def transform_point(point):
+    x, y, z = point
+    return (x, -z, y)  # correção eficaz para o posicionamento
+
+
+def transform_quaternion(q):
+    w, x, y, z = q
+    # Trocar Y por Z
+    return (w, x, z, y)
+
+
+###############################################################
+# Extremidades de uma parede
+###############################################################
+def wall_endpoints(wall):
+    """
+    Retorna (início, fim) da linha base de um WallRecord, já no sistema
+    Dynamo/Revit. O fim é o início deslocado de 'length' no eixo X local,
+    rotacionado pelo quaternion da parede em torno do início.
+    """
+    start = (wall.x, wall.y, wall.z)
+    rotation = Rotation(transform_quaternion(wall.rotation))
+    dx, dy, dz = rotation.apply((wall.length, 0.0, 0.0))
+    end = (wall.x + dx, wall.y + dy, wall.z + dz)
+    return transform_point(start), transform_point(end)
@@ -0,0 +1,58 @@
+"""
+Divisão do scan em pavimentos pela altura das paredes.
+
+No XML a altura é o eixo y (position y); no sistema do Revit ela vira o z
+das extremidades. As paredes são agrupadas por essa cota: ordenadas, um novo
+pavimento começa sempre que a diferença para a cota anterior passa de
+STOREY_GAP. Cada pavimento é então associado ao nível existente mais
+próximo (até LEVEL_TOLERANCE) ou marcado para criação.
+"""
+
+from .geometry import FEET_PER_METER
+
+STOREY_GAP = 1.5 * FEET_PER_METER       # separação mínima entre pavimentos
+LEVEL_TOLERANCE = 0.1 * FEET_PER_METER  # distância máxima até um nível existente
+
+
+###############################################################
+# Agrupamento das paredes por cota
+###############################################################
+def partition_storeys(endpoints, gap=STOREY_GAP):
+    """
+    Retorna (storey_of_wall, elevations): o índice do pavimento de cada
+    parede e a cota (menor z) de cada pavimento, em ordem crescente.
+    """
+    order = sorted(range(len(endpoints)), key=lambda i: endpoints[i][0][2])
+    storey_of_wall = [0] * len(endpoints)
+    elevations = []
+    previous = None
+    for i in order:
+        z = endpoints[i][0][2]
+        if previous is None or z - previous > gap:
+            elevations.append(z)
+        storey_of_wall[i] = len(elevations) - 1
+        previous = z
+    return storey_of_wall, elevations
+
+
+def match_levels(elevations, level_elevations, tolerance=LEVEL_TOLERANCE):
+    """
+    Para cada cota de pavimento, o índice do nível (em level_elevations) mais
+    próximo dentro de 'tolerance', ou None se um nível novo for necessário.
+    """
+    matches = []
+    for elevation in elevations:
+        best = None
+        best_distance = tolerance
+        for k, level_elevation in enumerate(level_elevations):
+            distance = abs(level_elevation - elevation)
+            if distance <= best_distance:
+                best = k
+                best_distance = distance
+        matches.append(best)
+    return matches
+
+
+def storey_level_name(elevation):
+    """Nome do nível criado para um pavimento, com a cota em metros."""
+    return 'Scan {:+.2f}'.format(elevation / FEET_PER_METER)
@@ -0,0 +1,130 @@
+"""
+União de segmentos colineares do scan antes do Wall.Create.
+
+O pcon.scan costuma dividir uma mesma parede física em vários objetos
+"Wall" curtos e alinhados. Cada um vira um Wall.Create e mais uniões
+automáticas no Revit. Aqui, segmentos encadeados (o fim de um coincide com o
+início do seguinte, dentro de MERGE_TOLERANCE), com a mesma direção, altura
+e espessura, são fundidos em uma única parede. As aberturas passam para a
+parede resultante, com a posição x deslocada para o novo início.
+
+Só são unidos segmentos no mesmo sentido, pois a posição das aberturas é
+medida a partir do início de cada segmento.
+"""
+
+import math
+
+from .model import OpeningRecord, WallRecord
+from .spatial import PointGrid
+
+MERGE_TOLERANCE = 1.0 / 32.0                   # ~1 cm, em pés
+MERGE_ANGLE_TOLERANCE = math.radians(0.5)      # desvio máximo entre direções
+
+
+###############################################################
+# Critérios de união
+###############################################################
+def _direction(start, end):
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    norm = math.hypot(dx, dy)
+    if norm == 0.0:
+        return None
+    return (dx / norm, dy / norm)
+
+
+def _can_merge(a, b, dir_a, dir_b, tolerance, sin_tolerance):
+    if dir_a is None or dir_b is None:
+        return False
+    if abs(a.height - b.height) > tolerance or abs(a.thickness - b.thickness) > tolerance:
+        return False
+    cross = dir_a[0] * dir_b[1] - dir_a[1] * dir_b[0]
+    dot = dir_a[0] * dir_b[0] + dir_a[1] * dir_b[1]
+    return dot > 0.0 and abs(cross) <= sin_tolerance
+
+
+def _shift_opening(opening, dx):
+    return OpeningRecord(opening.kind, opening.width, opening.height, opening.parapet,
+                         opening.alignment, opening.x + dx, opening.y, opening.z,
+                         opening.qw, opening.qx, opening.qy, opening.qz)
+
+
+###############################################################
+# Ponto de entrada
+###############################################################
+def merge_collinear_walls(walls, endpoints, tolerance=MERGE_TOLERANCE,
+                          angle_tolerance=MERGE_ANGLE_TOLERANCE):
+    """
+    Retorna (walls, endpoints) com os segmentos colineares encadeados unidos.
+    Paredes que não se unem a nenhuma outra são devolvidas sem alteração e a
+    ordem segue a do primeiro segmento de cada cadeia.
+    """
+    n = len(walls)
+    directions = [_direction(start, end) for start, end in endpoints]
+    sin_tolerance = math.sin(angle_tolerance)
+
+    starts = PointGrid(tolerance)
+    for i, (start, end) in enumerate(endpoints):
+        starts.insert(start, i)
+
+    # Ligação fim -> início só quando o candidato é único nos dois sentidos
+    following = [None] * n
+    previous = [None] * n
+    ambiguous = set()
+    for i, (start, end) in enumerate(endpoints):
+        candidates = [j for j in starts.near(end, tolerance)
+                      if j != i and _can_merge(walls[i], walls[j], directions[i], directions[j],
+                                               tolerance, sin_tolerance)]
+        if len(candidates) != 1:
+            continue
+        j = candidates[0]
+        if previous[j] is not None:
+            ambiguous.add(j)
+            continue
+        following[i] = j
+        previous[j] = i
+    for j in ambiguous:
+        i = previous[j]
+        if i is not None:
+            following[i] = None
+            previous[j] = None
+
+    merged_walls = []
+    merged_endpoints = []
+    visited = [False] * n
+    for i in range(n):
+        if visited[i] or (previous[i] is not None and not visited[previous[i]]):
+            continue
+        chain = [i]
+        visited[i] = True
+        while following[chain[-1]] is not None and not visited[following[chain[-1]]]:
+            chain.append(following[chain[-1]])
+            visited[chain[-1]] = True
+
+        first = walls[i]
+        if len(chain) == 1:
+            merged_walls.append(first)
+            merged_endpoints.append(endpoints[i])
+            continue
+
+        start = endpoints[i][0]
+        end = endpoints[chain[-1]][1]
+        direction = directions[i]
+        openings = []
+        for k in chain:
+            offset = ((endpoints[k][0][0] - start[0]) * direction[0]
+                      + (endpoints[k][0][1] - start[1]) * direction[1])
+            openings.extend(_shift_opening(opening, offset) for opening in walls[k].openings)
+        length = math.sqrt(sum((e - s) ** 2 for s, e in zip(start, end)))
+        merged_walls.append(WallRecord(length, first.height, first.thickness,
+                                       first.x, first.y, first.z,
+                                       first.qw, first.qx, first.qy, first.qz,
+                                       tuple(openings)))
+        merged_endpoints.append((start, end))
+
+    # Ciclos fechados (sem início de cadeia) ficam como estavam
+    for i in range(n):
+        if not visited[i]:
+            merged_walls.append(walls[i])
+            merged_endpoints.append(endpoints[i])
+    return merged_walls, merged_endpoints
@@ -0,0 +1,73 @@
+"""
+Registros compactos do scan, independentes do Revit/Dynamo.
+
+Cada parede e cada abertura é decodificada do XML uma única vez para um
+objeto com __slots__ contendo apenas floats já convertidos para pés.
+As rotações ficam no sistema do XML (w, x, y, z), como no arquivo.
+"""
+
+
+class OpeningRecord(object):
+    """Porta, janela ou passagem (Door/Window/Alley) pertencente a uma parede."""
+
+    __slots__ = ('kind', 'width', 'height', 'parapet', 'alignment',
+                 'x', 'y', 'z', 'qw', 'qx', 'qy', 'qz')
+
+    def __init__(self, kind, width, height, parapet, alignment,
+                 x, y, z, qw=1.0, qx=0.0, qy=0.0, qz=0.0):
+        self.kind = kind
+        self.width = width
+        self.height = height
+        self.parapet = parapet  # None quando o XML não traz <parapet>
+        self.alignment = alignment
+        self.x = x
+        self.y = y
+        self.z = z
+        self.qw = qw
+        self.qx = qx
+        self.qy = qy
+        self.qz = qz
+
+    @property
+    def position(self):
+        return (self.x, self.y, self.z)
+
+    @property
+    def rotation(self):
+        return (self.qw, self.qx, self.qy, self.qz)
+
+    def __repr__(self):
+        return "OpeningRecord({}, width={:.4f}, height={:.4f})".format(self.kind, self.width, self.height)
+
+
+class WallRecord(object):
+    """Parede do scan: início (x, y, z), comprimento, altura, espessura e rotação."""
+
+    __slots__ = ('length', 'height', 'thickness',
+                 'x', 'y', 'z', 'qw', 'qx', 'qy', 'qz', 'openings')
+
+    def __init__(self, length, height, thickness, x, y, z,
+                 qw=1.0, qx=0.0, qy=0.0, qz=0.0, openings=()):
+        self.length = length
+        self.height = height
+        self.thickness = thickness
+        self.x = x
+        self.y = y
+        self.z = z
+        self.qw = qw
+        self.qx = qx
+        self.qy = qy
+        self.qz = qz
+        self.openings = openings
+
+    @property
+    def position(self):
+        return (self.x, self.y, self.z)
+
+    @property
+    def rotation(self):
+        return (self.qw, self.qx, self.qy, self.qz)
+
+    def __repr__(self):
+        return "WallRecord(length={:.4f}, height={:.4f}, openings={})".format(
+            self.length, self.height, len(self.openings))
@@ -0,0 +1,175 @@
+"""
+Cálculo em lote dos pontos de inserção de portas, janelas e passagens.
+
+Reproduz a lógica de posicionamento do create_openings_in_revit (rotação
+planar da parede, ajuste r/l/c das janelas e deslocamento de meia largura
+das portas/passagens) para todas as aberturas de uma vez, antes de abrir a
+transação no Revit. Assim a transação só executa NewFamilyInstance.
+
+A origem e a direção de cada parede vêm das extremidades calculadas por
+wall_endpoints_batch: a LocationCurve criada pelo Wall.Create começa no
+início da linha e fica na elevação do nível (base_z). As alturas dos pontos
+são somadas ao base_z da parede, então as aberturas de cada pavimento ficam
+na cota do seu nível.
+"""
+
+import math
+
+from .vectorized import HAS_NUMPY, np
+
+
+class OpeningBatch(object):
+    """
+    Aberturas de um scan prontas para inserção.
+
+    wall_index[i] é o índice da parede hospedeira, openings[i] o
+    OpeningRecord e points[i] o ponto de inserção (x, y, z) em pés.
+    Com NumPy, wall_index e points são arrays (N,) e (N, 3).
+    """
+
+    __slots__ = ('wall_index', 'openings', 'points')
+
+    def __init__(self, wall_index, openings, points):
+        self.wall_index = wall_index
+        self.openings = openings
+        self.points = points
+
+    def __len__(self):
+        return len(self.openings)
+
+    def __iter__(self):
+        wall_index = self.wall_index
+        points = self.points
+        if HAS_NUMPY and isinstance(points, np.ndarray):
+            wall_index = wall_index.tolist()
+            points = points.tolist()
+        for i, opening in enumerate(self.openings):
+            yield wall_index[i], opening, tuple(points[i])
+
+    def for_walls(self, indices):
+        """
+        Sub-lote só com as aberturas das paredes em 'indices', com wall_index
+        renumerado para a posição de cada parede nessa lista.
+        """
+        position = dict((wall, k) for k, wall in enumerate(indices))
+        wall_index = []
+        openings = []
+        points = []
+        for i, opening, point in self:
+            if i in position:
+                wall_index.append(position[i])
+                openings.append(opening)
+                points.append(point)
+        if HAS_NUMPY and isinstance(self.points, np.ndarray):
+            return OpeningBatch(np.asarray(wall_index, dtype=np.intp), openings,
+                                np.asarray(points, dtype=float).reshape(-1, 3))
+        return OpeningBatch(wall_index, openings, points)
+
+
+###############################################################
+# Deslocamentos locais (eixo da parede) por tipo de abertura
+###############################################################
+def _local_offset(opening):
+    half_width = opening.width / 2.0
+    if opening.kind == 'Window':
+        # "r" e "c" deslocam +meia largura, "l" desloca -meia largura
+        if opening.alignment == 'l':
+            return (-half_width, 0.0)
+        return (half_width, 0.0)
+    # Door / Alley
+    return (half_width, half_width)
+
+
+###############################################################
+# Versão por abertura (sem NumPy)
+###############################################################
+def _plan_openings_python(walls, endpoints, base_z):
+    wall_index = []
+    openings = []
+    points = []
+    per_wall = isinstance(base_z, (list, tuple))
+    for i, (wall, (start, end)) in enumerate(zip(walls, endpoints)):
+        if not wall.openings:
+            continue
+        wall_base_z = base_z[i] if per_wall else base_z
+        # Rotação planar da parede (cos, sin), calculada uma vez para todos os filhos
+        dx = end[0] - start[0]
+        dy = end[1] - start[1]
+        norm = math.hypot(dx, dy) or 1.0
+        c = dx / norm
+        s = dy / norm
+        for opening in wall.openings:
+            ox, oy = _local_offset(opening)
+            lx = opening.x + ox
+            ly = opening.y + oy
+            x = start[0] + lx * c - ly * s
+            y = start[1] + lx * s + ly * c
+            if opening.kind == 'Window':
+                # Ajusta a altura para posicionar a janela no meio
+                z = wall_base_z + opening.height / 2.0
+            else:
+                z = wall_base_z + opening.z
+            wall_index.append(i)
+            openings.append(opening)
+            points.append((x, y, z))
+    return OpeningBatch(wall_index, openings, points)
+
+
+###############################################################
+# Versão vetorizada
+###############################################################
+def _plan_openings_numpy(walls, endpoints, base_z):
+    wall_index = []
+    openings = []
+    for i, wall in enumerate(walls):
+        for opening in wall.openings:
+            wall_index.append(i)
+            openings.append(opening)
+
+    n = len(openings)
+    if n == 0:
+        return OpeningBatch(np.empty(0, dtype=np.intp), openings, np.empty((0, 3)))
+
+    wall_index = np.asarray(wall_index, dtype=np.intp)
+    local = np.empty((n, 5))  # x, y, z, offset x, offset y
+    is_window = np.empty(n, dtype=bool)
+    heights = np.empty(n)
+    for k, opening in enumerate(openings):
+        ox, oy = _local_offset(opening)
+        local[k] = (opening.x, opening.y, opening.z, ox, oy)
+        is_window[k] = opening.kind == 'Window'
+        heights[k] = opening.height
+
+    ends = np.asarray(endpoints, dtype=float)[wall_index]  # (n, 2, 3)
+    origin = ends[:, 0]
+    direction = ends[:, 1, :2] - origin[:, :2]
+    norm = np.hypot(direction[:, 0], direction[:, 1])
+    norm[norm == 0.0] = 1.0
+    c = direction[:, 0] / norm
+    s = direction[:, 1] / norm
+
+    lx = local[:, 0] + local[:, 3]
+    ly = local[:, 1] + local[:, 4]
+    points = np.empty((n, 3))
+    points[:, 0] = origin[:, 0] + lx * c - ly * s
+    points[:, 1] = origin[:, 1] + lx * s + ly * c
+    if isinstance(base_z, (list, tuple)):
+        base_z = np.asarray(base_z, dtype=float)[wall_index]
+    points[:, 2] = base_z + np.where(is_window, heights / 2.0, local[:, 2])
+    return OpeningBatch(wall_index, openings, points)
+
+
+###############################################################
+# Ponto de entrada
+###############################################################
+def plan_openings(walls, endpoints, base_z=0.0):
+    """
+    Calcula os pontos de inserção de todas as aberturas dos WallRecord.
+
+    endpoints é a lista de (início, fim) de cada parede no sistema Revit
+    (ver wall_endpoints_batch) e base_z a elevação do nível, em pés (ou uma
+    lista com a elevação do nível de cada parede).
+    """
+    if HAS_NUMPY:
+        return _plan_openings_numpy(walls, endpoints, base_z)
+    return _plan_openings_python(walls, endpoints, base_z)
@@ -0,0 +1,100 @@
+"""
+Leitura do scan em segundo plano, em paralelo com a criação no Revit.
+
+ScanProducer lê o XML (iter_walls) em uma thread, agrupa as paredes em lotes
+de batch_size, calcula as extremidades e os pontos das aberturas de cada
+lote e os coloca em uma fila limitada (maxsize lotes). A thread da API do
+Revit consome os lotes prontos à medida que chegam; como as chamadas à API
+.NET liberam o GIL, a leitura do próximo lote acontece enquanto o atual é
+criado e o tempo total se aproxima de max(leitura, criação).
+
+Erros da leitura são repassados ao consumidor no próximo lote pedido.
+"""
+
+import threading
+import time
+
+try:
+    import queue
+except ImportError:  # IronPython 2.7
+    import Queue as queue
+
+from .openings import plan_openings
+from .reader import iter_walls
+from .vectorized import wall_endpoints_batch
+
+_DONE = object()
+
+
+class ScanProducer(object):
+    """Itera lotes (walls, endpoints, opening_plan) lidos em segundo plano."""
+
+    def __init__(self, xml_path, batch_size=500, maxsize=4, base_z=0.0, clock=time.perf_counter,
+                 backend='stdlib'):
+        self.xml_path = xml_path
+        self.batch_size = batch_size
+        self.base_z = base_z
+        self.clock = clock
+        self.backend = backend
+        self.parse_seconds = 0.0  # tempo de trabalho da thread de leitura
+        self.wait_seconds = 0.0   # tempo que o consumidor ficou esperando lotes
+        self._queue = queue.Queue(maxsize)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='scanxml-producer')
+        self._thread.daemon = True
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _put(self, item):
+        # Não bloqueia para sempre se o consumidor desistir (close)
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _emit(self, walls):
+        start = self.clock()
+        endpoints = wall_endpoints_batch(walls)
+        opening_plan = plan_openings(walls, endpoints, self.base_z)
+        self.parse_seconds += self.clock() - start
+        return self._put((walls, endpoints, opening_plan))
+
+    def _run(self):
+        try:
+            walls = []
+            start = self.clock()
+            for wall in iter_walls(self.xml_path, self.backend):
+                walls.append(wall)
+                if len(walls) >= self.batch_size:
+                    self.parse_seconds += self.clock() - start
+                    if not self._emit(walls):
+                        return
+                    walls = []
+                    start = self.clock()
+            self.parse_seconds += self.clock() - start
+            if walls and not self._emit(walls):
+                return
+            self._put(_DONE)
+        except Exception as e:
+            self._put(e)
+
+    def __iter__(self):
+        while True:
+            start = self.clock()
+            item = self._queue.get()
+            self.wait_seconds += self.clock() - start
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def close(self):
+        """Interrompe a leitura (ex.: erro na criação) e aguarda a thread."""
+        self._stop.set()
+        self._thread.join()
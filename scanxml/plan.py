@@ -0,0 +1,118 @@
+"""
+Plano de construção: o scan já preparado para ser só reproduzido no Revit.
+
+Guarda, em pés, as paredes (com as extremidades já ajustadas pela junção
+de nós e união de colineares), as aberturas e os pavimentos (cota e
+pavimento de cada parede). Os tipos de parede e de abertura não entram no
+plano: dependem dos tipos escolhidos no Dynamo e são resolvidos na
+criação, a partir das espessuras e tamanhos das paredes. É gerado fora do
+Revit (python -m scanxml) e lido pelo Scan2XML.py quando IN[0] aponta para
+um arquivo <nome>.plan.json ou, no formato binário mapeável
+(scanxml.planfile), <nome>.scanplan.
+"""
+
+import json
+import os
+
+from .levels import partition_storeys
+from .merge import merge_collinear_walls
+from .model import OpeningRecord, WallRecord
+from .spatial import snap_endpoints
+
+PLAN_VERSION = 2
+PLAN_SUFFIX = '.plan.json'
+
+
+class BuildPlan(object):
+    """Paredes, extremidades e pavimentos de um scan preparado."""
+
+    def __init__(self, walls, endpoints, storey_of_wall, storey_elevations,
+                 snapped=False, merged=False, source=None):
+        self.walls = walls
+        self.endpoints = endpoints
+        self.storey_of_wall = storey_of_wall
+        self.storey_elevations = storey_elevations
+        self.snapped = snapped
+        self.merged = merged
+        self.source = source
+
+
+###############################################################
+# Preparação
+###############################################################
+def prepare_plan(walls, endpoints, snap=False, merge=False, source=None):
+    """Aplica a junção de nós e a união de colineares e divide em pavimentos."""
+    if snap:
+        endpoints = snap_endpoints(endpoints)[0]
+    if merge:
+        walls, endpoints = merge_collinear_walls(walls, endpoints)
+    storey_of_wall, storey_elevations = partition_storeys(endpoints)
+    return BuildPlan(walls, endpoints, storey_of_wall, storey_elevations, snap, merge, source)
+
+
+###############################################################
+# Gravação e leitura
+###############################################################
+def plan_path(xml_path, out_dir=None, suffix=PLAN_SUFFIX):
+    base = os.path.splitext(xml_path)[0] + suffix
+    if out_dir:
+        base = os.path.join(out_dir, os.path.basename(base))
+    return base
+
+
+def plan_tables(plan):
+    """
+    Tabelas do plano: (paredes, aberturas). Cada linha de parede termina
+    com o pavimento; cada linha de abertura começa com o índice da parede.
+    """
+    walls = []
+    openings = []
+    for i, (wall, (start, end)) in enumerate(zip(plan.walls, plan.endpoints)):
+        walls.append([wall.length, wall.height, wall.thickness,
+                      wall.x, wall.y, wall.z, wall.qw, wall.qx, wall.qy, wall.qz]
+                     + list(start) + list(end)
+                     + [plan.storey_of_wall[i]])
+        for opening in wall.openings:
+            openings.append([i, opening.kind, opening.width, opening.height, opening.parapet,
+                             opening.alignment, opening.x, opening.y, opening.z,
+                             opening.qw, opening.qx, opening.qy, opening.qz])
+    return walls, openings
+
+
+def save_plan(path, plan):
+    walls, openings = plan_tables(plan)
+    data = {
+        'version': PLAN_VERSION,
+        'source': plan.source,
+        'snapped': plan.snapped,
+        'merged': plan.merged,
+        'levels': plan.storey_elevations,
+        'walls': walls,
+        'openings': openings,
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_plan(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != PLAN_VERSION:
+        raise ValueError("Versão do plano não suportada: {}".format(data.get('version')))
+
+    openings_by_wall = {}
+    for o in data['openings']:
+        openings_by_wall.setdefault(o[0], []).append(
+            OpeningRecord(o[1], o[2], o[3], o[4], o[5], o[6], o[7], o[8], o[9], o[10], o[11], o[12]))
+    walls = []
+    endpoints = []
+    storey_of_wall = []
+    for i, v in enumerate(data['walls']):
+        walls.append(WallRecord(v[0], v[1], v[2], v[3], v[4], v[5], v[6], v[7], v[8], v[9],
+                                tuple(openings_by_wall.get(i, ()))))
+        endpoints.append((tuple(v[10:13]), tuple(v[13:16])))
+        storey_of_wall.append(v[16])
+    return BuildPlan(walls, endpoints, storey_of_wall, data['levels'],
+                     data['snapped'], data['merged'], data.get('source'))
@@ -0,0 +1,210 @@
+"""
+Plano de construção em formato binário, lido por mapeamento de memória.
+
+Mesmo conteúdo do .plan.json (scanxml.plan), mas em tabelas de tamanho fixo
+que o Scan2XML.py mapeia com mmap. Na reprodução direta, iter_batches()
+decodifica só um lote de linhas por vez, à medida que a criação no Revit
+os consome, sem montar o plano inteiro antes. As tabelas são de doubles
+little-endian (índices inteiros cabem exatamente em um double), o que
+permite acessá-las como memoryview ou, com NumPy, como arrays sem cópia.
+
+Layout (<nome>.scanplan):
+    cabeçalho      HEADER (magic, versão, flags, n níveis, n paredes,
+                   n aberturas, bytes dos alinhamentos)
+    níveis         n_levels doubles (cota de cada pavimento)
+    paredes        n_walls * WALL_ROW doubles
+    aberturas      n_openings * OPENING_ROW doubles (peitoril ausente = NaN)
+    alinhamentos   textos UTF-8 distintos de <alignment>, separados por NUL;
+                   as aberturas guardam o índice nessa lista
+"""
+
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from .model import OpeningRecord, WallRecord
+from .openings import plan_openings
+from .plan import BuildPlan, plan_tables
+
+PLANFILE_VERSION = 3
+PLANFILE_SUFFIX = '.scanplan'
+
+MAGIC = b'SCANPLAN'
+HEADER = struct.Struct('<8sIIIIII')  # 32 bytes: tabelas alinhadas em 8
+FLAG_SNAPPED = 1
+FLAG_MERGED = 2
+
+# length, height, thickness, x, y, z, qw, qx, qy, qz, início (3), fim (3),
+# pavimento, primeira abertura, nº de aberturas
+WALL_ROW = 19
+# parede, tipo, width, height, parapet, alinhamento, x, y, z, qw, qx, qy, qz
+OPENING_ROW = 13
+
+KINDS = ('Door', 'Window', 'Alley')
+
+
+###############################################################
+# Gravação
+###############################################################
+def _table(rows):
+    values = array('d')
+    for row in rows:
+        values.extend(row)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def save_planfile(path, plan):
+    walls, openings = plan_tables(plan)
+
+    wall_rows = []
+    opening_rows = []
+    alignments = {}
+    for i, row in enumerate(walls):
+        first = len(opening_rows)
+        wall_rows.append(row + [first, len(plan.walls[i].openings)])
+        while len(opening_rows) < len(openings) and openings[len(opening_rows)][0] == i:
+            o = openings[len(opening_rows)]
+            parapet = float('nan') if o[4] is None else o[4]
+            alignment = alignments.setdefault(o[5], len(alignments))
+            opening_rows.append([o[0], KINDS.index(o[1]), o[2], o[3], parapet, alignment] + o[6:13])
+
+    flags = (FLAG_SNAPPED if plan.snapped else 0) | (FLAG_MERGED if plan.merged else 0)
+    alignment_text = '\0'.join(sorted(alignments, key=alignments.get)).encode('utf-8')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, PLANFILE_VERSION, flags, len(plan.storey_elevations),
+                            len(wall_rows), len(opening_rows), len(alignment_text)))
+        _table([plan.storey_elevations]).tofile(f)
+        _table(wall_rows).tofile(f)
+        _table(opening_rows).tofile(f)
+        f.write(alignment_text)
+    os.replace(tmp_path, path)
+
+
+###############################################################
+# Leitura por mapeamento de memória
+###############################################################
+class MappedPlan(object):
+    """
+    Plano mapeado em memória. walls_table/openings_table são memoryview de
+    doubles (uma linha a cada WALL_ROW/OPENING_ROW valores); iter_walls() e
+    iter_batches() montam os WallRecord só à medida que são pedidos.
+    Usar com 'with' (ou close()) para liberar o mapeamento.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, flags, n_levels,
+         self.n_walls, self.n_openings, alignment_size) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != PLANFILE_VERSION:
+            self.close()
+            raise ValueError("Arquivo de plano inválido ou de outra versão: {}".format(path))
+        if sys.byteorder == 'big':
+            self.close()
+            raise ValueError("O plano binário só pode ser mapeado em máquinas little-endian.")
+        self.snapped = bool(flags & FLAG_SNAPPED)
+        self.merged = bool(flags & FLAG_MERGED)
+
+        n_values = n_levels + self.n_walls * WALL_ROW + self.n_openings * OPENING_ROW
+        end = HEADER.size + n_values * 8
+        self.alignments = self._map[end:end + alignment_size].decode('utf-8').split('\0')
+        values = memoryview(self._map)[HEADER.size:end].cast('d')
+        self._values = values
+        self.decode_seconds = 0.0  # tempo gasto em iter_batches
+        offset = 0
+        self.levels = values[offset:offset + n_levels]
+        offset += n_levels
+        self.walls_table = values[offset:offset + self.n_walls * WALL_ROW]
+        offset += self.n_walls * WALL_ROW
+        self.openings_table = values[offset:offset + self.n_openings * OPENING_ROW]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for name in ('levels', 'walls_table', 'openings_table', '_values'):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _opening(self, k):
+        o = self.openings_table[k * OPENING_ROW:(k + 1) * OPENING_ROW]
+        return self._opening_record(o, 0)
+
+    def _opening_record(self, o, base):
+        parapet = o[base + 4]
+        return OpeningRecord(KINDS[int(o[base + 1])], o[base + 2], o[base + 3],
+                             None if math.isnan(parapet) else parapet, self.alignments[int(o[base + 5])],
+                             o[base + 6], o[base + 7], o[base + 8], o[base + 9], o[base + 10],
+                             o[base + 11], o[base + 12])
+
+    def iter_walls(self):
+        """Gera (WallRecord, (início, fim), pavimento) na ordem do plano."""
+        table = self.walls_table
+        for i in range(self.n_walls):
+            v = table[i * WALL_ROW:(i + 1) * WALL_ROW].tolist()
+            first = int(v[17])
+            openings = tuple(self._opening(k) for k in range(first, first + int(v[18])))
+            wall = WallRecord(v[0], v[1], v[2], v[3], v[4], v[5], v[6], v[7], v[8], v[9], openings)
+            yield wall, (tuple(v[10:13]), tuple(v[13:16])), int(v[16])
+
+    def iter_batches(self, batch_size=500, base_z=0.0, clock=time.perf_counter):
+        """
+        Gera lotes (walls, endpoints, opening_plan) como o ScanProducer,
+        decodificando a cada lote só as suas linhas das tabelas mapeadas.
+        O tempo de decodificação é somado em decode_seconds.
+        """
+        walls_table = self.walls_table
+        openings_table = self.openings_table
+        for first_wall in range(0, self.n_walls, batch_size):
+            start = clock()
+            last_wall = min(first_wall + batch_size, self.n_walls)
+            rows = walls_table[first_wall * WALL_ROW:last_wall * WALL_ROW].tolist()
+            first_opening = int(rows[17])
+            last_row = (last_wall - first_wall - 1) * WALL_ROW
+            last_opening = int(rows[last_row + 17] + rows[last_row + 18])
+            opening_rows = openings_table[first_opening * OPENING_ROW:last_opening * OPENING_ROW].tolist()
+
+            walls = []
+            endpoints = []
+            for base in range(0, len(rows), WALL_ROW):
+                v = rows[base:base + WALL_ROW]
+                k = int(v[17]) - first_opening
+                openings = tuple(self._opening_record(opening_rows, (k + j) * OPENING_ROW)
+                                 for j in range(int(v[18])))
+                walls.append(WallRecord(v[0], v[1], v[2], v[3], v[4], v[5], v[6], v[7], v[8], v[9], openings))
+                endpoints.append((tuple(v[10:13]), tuple(v[13:16])))
+            opening_plan = plan_openings(walls, endpoints, base_z)
+            self.decode_seconds += clock() - start
+            yield walls, endpoints, opening_plan
+
+    def to_build_plan(self):
+        walls = []
+        endpoints = []
+        storey_of_wall = []
+        for wall, ends, storey in self.iter_walls():
+            walls.append(wall)
+            endpoints.append(ends)
+            storey_of_wall.append(storey)
+        return BuildPlan(walls, endpoints, storey_of_wall, self.levels.tolist(),
+                         self.snapped, self.merged)
+
+
+def load_planfile(path):
+    """Lê um .scanplan como BuildPlan (o mapeamento é liberado ao final)."""
+    with MappedPlan(path) as mapped:
+        return mapped.to_build_plan()
@@ -0,0 +1,334 @@
+"""
+Leitura incremental (streaming) do XML eoxObjects exportado pelo pcon.scan.
+
+Em vez de carregar o documento inteiro com ET.parse, percorre o arquivo com
+ET.iterparse e entrega uma parede por vez, já decodificada em WallRecord
+(valores em pés), liberando os elementos consumidos. O pico de memória fica
+constante, independente do tamanho do arquivo.
+
+Há três leitores (backend), que produzem exatamente os mesmos registros:
+    'stdlib' - xml.etree.ElementTree.iterparse (padrão)
+    'lxml'   - lxml.etree.iterparse, quando o lxml está instalado
+    'regex'  - tokenizador específico do esquema eoxObjects sobre o arquivo
+               mapeado em memória (mmap), sem montar elementos
+Em todos, as tags de cada objeto são tratadas em uma única passada e os
+textos numéricos repetidos ("0.000000", "2.581186"...) são convertidos uma
+única vez (memoização).
+"""
+
+import io
+import mmap
+import re
+import xml.etree.ElementTree as ET
+
+from .geometry import FEET_PER_METER, IDENTITY_QUATERNION
+from .model import OpeningRecord, WallRecord
+
+try:
+    from lxml import etree as lxml_etree
+    HAS_LXML = True
+except ImportError:
+    lxml_etree = None
+    HAS_LXML = False
+
+OPENING_TYPES = ("Door", "Window", "Alley")
+BACKENDS = ('stdlib', 'lxml', 'regex')
+MEMO_LIMIT = 1 << 16  # entradas por cache de números
+
+
+###############################################################
+# Conversão de números com memoização
+###############################################################
+def _number_cache(scale, limit=MEMO_LIMIT):
+    """Retorna convert(texto) = float(texto) * scale, guardando os textos já vistos."""
+    cache = {}
+
+    def convert(text):
+        value = cache.get(text)
+        if value is None:
+            value = float(text) * scale
+            if len(cache) < limit:
+                cache[text] = value
+        return value
+    return convert
+
+
+class _Numbers(object):
+    __slots__ = ('feet', 'raw')
+
+    def __init__(self):
+        self.feet = _number_cache(FEET_PER_METER)
+        self.raw = _number_cache(1.0)
+
+
+###############################################################
+# Decodificação de elementos (stdlib e lxml)
+###############################################################
+def _feet_xyz(elem, numbers):
+    feet = numbers.feet
+    return (feet(elem.get('x')), feet(elem.get('y')), feet(elem.get('z')))
+
+
+def _wxyz(elem, numbers):
+    if elem is None:
+        return IDENTITY_QUATERNION
+    raw = numbers.raw
+    return (raw(elem.get('w')), raw(elem.get('x')), raw(elem.get('y')), raw(elem.get('z')))
+
+
+def _decode_opening(child, numbers):
+    feet = numbers.feet
+    values = {}
+    position = rotation = None
+    alignment = 'c'
+    for node in child:
+        tag = node.tag
+        if tag == 'position':
+            position = node
+        elif tag == 'rotation':
+            rotation = node
+        elif tag == 'alignment':
+            if node.text:
+                alignment = node.text.strip().lower()
+        elif tag in ('width', 'height', 'parapet') and tag not in values:
+            values[tag] = feet(node.text) if node.text is not None else None
+    x, y, z = _feet_xyz(position, numbers)
+    qw, qx, qy, qz = _wxyz(rotation, numbers)
+    return OpeningRecord(
+        child.get('structure_type'),
+        values.get('width'),
+        values.get('height'),
+        values.get('parapet'),
+        alignment,
+        x, y, z, qw, qx, qy, qz,
+    )
+
+
+def _decode_wall(obj, numbers):
+    feet = numbers.feet
+    values = {}
+    position = rotation = None
+    openings = []
+    for node in obj:
+        tag = node.tag
+        if tag == 'child':
+            if node.get('structure_type') in OPENING_TYPES:
+                openings.append(_decode_opening(node, numbers))
+        elif tag == 'position':
+            if position is None:
+                position = node
+        elif tag == 'rotation':
+            if rotation is None:
+                rotation = node
+        elif tag in ('length', 'height', 'thickness') and tag not in values:
+            values[tag] = feet(node.text) if node.text is not None else None
+    x, y, z = _feet_xyz(position, numbers)
+    qw, qx, qy, qz = _wxyz(rotation, numbers)
+    thickness = values.get('thickness')
+    return WallRecord(
+        values.get('length'),
+        values.get('height'),
+        0.0 if thickness is None else thickness,
+        x, y, z, qw, qx, qy, qz,
+        tuple(openings),
+    )
+
+
+def _iter_parsed(context):
+    numbers = _Numbers()
+    root = None
+    depth = 0
+    for event, elem in context:
+        if event == 'start':
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+
+        depth -= 1
+        # Apenas os <object> filhos diretos de <eoxObjects> interessam
+        if depth != 1 or elem.tag != 'object':
+            continue
+
+        if elem.get('structure_type') == 'Wall':
+            yield _decode_wall(elem, numbers)
+
+        # Libera o elemento consumido e a referência mantida pela raiz
+        elem.clear()
+        root.clear()
+
+
+###############################################################
+# Tokenizador do esquema eoxObjects (regex sobre mmap)
+###############################################################
+_CHILD_RE = re.compile(rb'<child\b([^>]*)>(.*?)</child>', re.S)
+# Atributos com aspas duplas ou simples: grupos (nome, aspa, valor)
+_ATTR_RE = re.compile(rb'(\w+)\s*=\s*(["\'])(.*?)\2', re.S)
+_STRUCTURE_RE = re.compile(rb'\bstructure_type\s*=\s*(["\'])(.*?)\1', re.S)
+_COMMENT_RE = re.compile(rb'<!--.*?-->', re.S)
+
+
+def _tag_re(names):
+    """Regex que casa só as tags de 'names', vazias (<x .../>) ou com texto (<x>texto</x>)."""
+    return re.compile(rb'<(' + b'|'.join(names) + rb')\b([^>]*?)(?:/>|>([^<]*)</\1>)')
+
+
+def _scan_tags(body, tag_re):
+    """Primeira ocorrência de cada tag: texto ou dicionário de atributos."""
+    found = {}
+    for tag, attrs, text in tag_re.findall(body):
+        if tag in found:
+            continue
+        if attrs.strip():
+            found[tag] = dict((name, value) for name, _, value in _ATTR_RE.findall(attrs))
+        else:
+            found[tag] = text
+    return found
+
+
+def _feet_value(found, tag, numbers):
+    text = found.get(tag)
+    if not text or isinstance(text, dict):
+        return None
+    return numbers.feet(text)
+
+
+def _position_rotation(found, numbers):
+    feet = numbers.feet
+    raw = numbers.raw
+    try:
+        position = found[b'position']
+        x, y, z = feet(position[b'x']), feet(position[b'y']), feet(position[b'z'])
+        rotation = found.get(b'rotation')
+        if rotation is None:
+            return (x, y, z), IDENTITY_QUATERNION
+        return (x, y, z), (raw(rotation[b'w']), raw(rotation[b'x']), raw(rotation[b'y']), raw(rotation[b'z']))
+    except (KeyError, TypeError):
+        # Tag ausente, sem atributos ou com atributos que o tokenizador não reconhece
+        raise ValueError("<position>/<rotation> ilegível: {!r}".format(
+            (found.get(b'position'), found.get(b'rotation'))))
+
+
+_WALL_TAGS = _tag_re((b'length', b'height', b'thickness', b'position', b'rotation'))
+_OPENING_TAGS = _tag_re((b'width', b'height', b'parapet', b'alignment', b'position', b'rotation'))
+
+
+def _decode_opening_text(attrs, body, numbers):
+    found = _scan_tags(body, _OPENING_TAGS)
+    (x, y, z), (qw, qx, qy, qz) = _position_rotation(found, numbers)
+    alignment = found.get(b'alignment')
+    if alignment and not isinstance(alignment, dict):
+        alignment = alignment.decode('utf-8').strip().lower()
+    else:
+        alignment = 'c'
+    return OpeningRecord(
+        _STRUCTURE_RE.search(attrs).group(2).decode('utf-8'),
+        _feet_value(found, b'width', numbers),
+        _feet_value(found, b'height', numbers),
+        _feet_value(found, b'parapet', numbers),
+        alignment,
+        x, y, z, qw, qx, qy, qz,
+    )
+
+
+def _decode_wall_text(body, numbers):
+    openings = []
+    for match in _CHILD_RE.finditer(body):
+        structure = _STRUCTURE_RE.search(match.group(1))
+        if structure is not None and structure.group(2).decode('utf-8') in OPENING_TYPES:
+            openings.append(_decode_opening_text(match.group(1), match.group(2), numbers))
+    if openings or b'<child' in body:
+        body = _CHILD_RE.sub(b'', body)
+    found = _scan_tags(body, _WALL_TAGS)
+    (x, y, z), (qw, qx, qy, qz) = _position_rotation(found, numbers)
+    thickness = _feet_value(found, b'thickness', numbers)
+    return WallRecord(
+        _feet_value(found, b'length', numbers),
+        _feet_value(found, b'height', numbers),
+        0.0 if thickness is None else thickness,
+        x, y, z, qw, qx, qy, qz,
+        tuple(openings),
+    )
+
+
+def _iter_objects(data):
+    """
+    Gera (atributos, corpo) de cada <object> do nível superior, por busca de
+    bytes. Um <object .../> vazio tem corpo b''.
+    """
+    pos = data.find(b'<object')
+    while pos >= 0:
+        head_end = data.find(b'>', pos)
+        if head_end < 0:
+            raise ValueError("<object> sem fechamento na posição {}".format(pos))
+        if data[head_end - 1:head_end] == b'/':
+            yield data[pos + 7:head_end - 1], b''
+            pos = data.find(b'<object', head_end + 1)
+            continue
+        end = data.find(b'</object>', head_end)
+        if end < 0:
+            raise ValueError("<object> sem fechamento na posição {}".format(pos))
+        yield data[pos + 7:head_end], data[head_end + 1:end]
+        pos = data.find(b'<object', end + 9)
+
+
+def decode_walls(data):
+    """
+    Gera os WallRecord dos <object structure_type="Wall"> completos contidos
+    em 'data' (bytes, mmap ou um trecho do arquivo sem comentários).
+    """
+    numbers = _Numbers()
+    for attrs, body in _iter_objects(data):
+        structure = _STRUCTURE_RE.search(attrs)
+        if structure is not None and structure.group(2) == b'Wall':
+            yield _decode_wall_text(body, numbers)
+
+
+def _iter_regex(file_path):
+    with open(file_path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            text = data
+            if data.find(b'<!--') >= 0:
+                text = _COMMENT_RE.sub(b'', data[:])
+            for wall in decode_walls(text):
+                yield wall
+        finally:
+            data.close()
+
+
+###############################################################
+# Leitor incremental
+###############################################################
+def iter_walls(file_path, backend='stdlib'):
+    """
+    Gera, na ordem do arquivo, um WallRecord por <object structure_type="Wall">
+    com suas aberturas (Door/Window/Alley) em 'openings'. 'backend' escolhe o
+    leitor ('stdlib', 'lxml' ou 'regex'); 'lxml' sem o pacote instalado
+    volta para 'stdlib'. O arquivo só é aberto quando o gerador é consumido.
+    """
+    if backend == 'regex':
+        yield from _iter_regex(file_path)
+    elif backend == 'lxml' and HAS_LXML:
+        yield from _iter_parsed(lxml_etree.iterparse(file_path, events=('start', 'end')))
+    elif backend in BACKENDS:
+        yield from _iter_parsed(ET.iterparse(file_path, events=('start', 'end')))
+    else:
+        raise ValueError("Leitor de XML desconhecido: {}".format(backend))
+
+
+def decode_document(data, backend='stdlib'):
+    """
+    Como iter_walls, mas para um documento eoxObjects completo já em memória
+    (bytes), lido com o mesmo 'backend'.
+    """
+    if backend == 'regex':
+        if data.find(b'<!--') >= 0:
+            data = _COMMENT_RE.sub(b'', data)
+        yield from decode_walls(data)
+    elif backend == 'lxml' and HAS_LXML:
+        yield from _iter_parsed(lxml_etree.iterparse(io.BytesIO(data), events=('start', 'end')))
+    elif backend in BACKENDS:
+        yield from _iter_parsed(ET.iterparse(io.BytesIO(data), events=('start', 'end')))
+    else:
+        raise ValueError("Leitor de XML desconhecido: {}".format(backend))
@@ -0,0 +1,125 @@
+"""
+Leitura paralela de um único XML grande, em fatias (shards).
+
+O arquivo é dividido em intervalos de bytes que começam sempre em um
+<object> do nível superior (no eoxObjects os <object> não se aninham; as
+aberturas são <child>). Cada processo do pool monta um documento com o
+início do arquivo (declaração e <eoxObjects ...>), a sua fatia e o
+fechamento da raiz, lê esse documento com o mesmo leitor de scanxml.reader
+escolhido para a leitura serial e calcula as extremidades das paredes. As
+fatias voltam como as tabelas compactas do cache (scanxml.cache.pack_scan),
+não como objetos, e são remontadas na ordem do arquivo; a lista final é a
+mesma da leitura serial.
+
+Arquivos com comentários (<!-- -->) não são fatiados, já que um corte
+poderia cair dentro de um comentário; são lidos inteiros em um só processo.
+"""
+
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import pack_scan, unpack_scan
+from .reader import decode_document, iter_walls
+from .vectorized import wall_endpoints_batch
+
+SHARD_MIN_BYTES = 1 << 20  # fatias menores não compensam o custo do processo
+SHARDS_PER_WORKER = 2       # mais fatias que processos equilibram a carga
+
+_OPEN = b'<object'
+_CLOSE = b'</object>'
+
+
+###############################################################
+# Divisão do arquivo
+###############################################################
+def shard_ranges(path, n_shards, min_bytes=SHARD_MIN_BYTES):
+    """
+    Retorna [(início, fim)] em bytes, com no máximo n_shards fatias de pelo
+    menos ~min_bytes. Cada início é um '<object' do nível superior e a
+    última fatia termina no fechamento da raiz; assim, o trecho antes da
+    primeira fatia e o depois da última completam o documento. A lista é
+    vazia se o arquivo não tem objetos.
+    """
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            size = len(data)
+            first = data.find(_OPEN)
+            if first < 0:
+                return []
+            if data.find(b'<!--') >= 0:
+                return [(0, size)]
+            tail = data.rfind(b'</')  # </eoxObjects>
+            n_shards = max(1, min(n_shards, (tail - first) // max(min_bytes, 1)))
+            starts = [first]
+            for k in range(1, n_shards):
+                target = first + (tail - first) * k // n_shards
+                if target <= starts[-1]:
+                    continue
+                # Fim do objeto em que o corte caiu e início do próximo
+                end = data.find(_CLOSE, target)
+                if end < 0:
+                    break
+                start = data.find(_OPEN, end + len(_CLOSE))
+                if start < 0 or start > tail:
+                    break
+                if start > starts[-1]:
+                    starts.append(start)
+        finally:
+            data.close()
+    return list(zip(starts, starts[1:] + [tail]))
+
+
+###############################################################
+# Uma fatia (executada em um processo do pool)
+###############################################################
+def parse_shard(job):
+    """
+    job = (path, backend, início do 1º objeto, fechamento da raiz, início,
+    fim). Retorna as tabelas de pack_scan das paredes da fatia.
+    """
+    path, backend, first, tail, start, end = job
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            document = data[:first] + data[start:end] + data[tail:]
+        finally:
+            data.close()
+    walls = list(decode_document(document, backend))
+    return pack_scan(walls, wall_endpoints_batch(walls))
+
+
+###############################################################
+# Arquivo inteiro
+###############################################################
+def parse_sharded(path, workers=None, backend='stdlib', min_bytes=SHARD_MIN_BYTES, python=None):
+    """
+    Lê o XML em fatias paralelas com até 'workers' processos (padrão: nº de
+    CPUs), cada fatia com o leitor 'backend'. Retorna (walls, endpoints) na
+    ordem do arquivo, como list(iter_walls(path, backend)) e
+    wall_endpoints_batch(walls). 'python' é o executável dos processos
+    (necessário dentro do Revit, onde sys.executable não é um Python).
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = shard_ranges(path, workers * SHARDS_PER_WORKER, min_bytes)
+    if workers == 1 or len(ranges) <= 1:
+        walls = list(iter_walls(path, backend))
+        return walls, wall_endpoints_batch(walls)
+
+    first, tail = ranges[0][0], ranges[-1][1]
+    jobs = [(path, backend, first, tail, start, end) for start, end in ranges]
+    walls = []
+    endpoints = []
+    context = None
+    if python:
+        context = multiprocessing.get_context('spawn')
+        context.set_executable(python)
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=context) as executor:
+        # map devolve os resultados na ordem das fatias
+        for tables in executor.map(parse_shard, jobs):
+            shard_walls, shard_endpoints = unpack_scan(*tables)
+            walls.extend(shard_walls)
+            endpoints.extend(shard_endpoints)
+    return walls, endpoints
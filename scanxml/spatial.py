@@ -0,0 +1,131 @@
+"""
+Índice espacial em grade para as extremidades das paredes.
+
+Cada ponto (x, y, z) em pés é guardado na célula int(coord / cell_size).
+Uma consulta com raio <= cell_size só precisa olhar a célula do ponto e as
+vizinhas, então encontrar os pontos próximos de todas as extremidades custa
+O(N) em média, em vez de comparar todos os pares.
+"""
+
+import math
+
+
+class PointGrid(object):
+    """Grade uniforme de pontos 3D com um item associado a cada ponto."""
+
+    __slots__ = ('cell_size', 'cells')
+
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self.cells = {}
+
+    def _cell(self, point):
+        size = self.cell_size
+        return (int(math.floor(point[0] / size)),
+                int(math.floor(point[1] / size)),
+                int(math.floor(point[2] / size)))
+
+    def insert(self, point, item):
+        self.cells.setdefault(self._cell(point), []).append((point, item))
+
+    def near(self, point, radius):
+        """Itens cujos pontos estão a até 'radius' de 'point' (radius <= cell_size)."""
+        cx, cy, cz = self._cell(point)
+        radius_sq = radius * radius
+        found = []
+        for i in (cx - 1, cx, cx + 1):
+            for j in (cy - 1, cy, cy + 1):
+                for k in (cz - 1, cz, cz + 1):
+                    for other, item in self.cells.get((i, j, k), ()):
+                        dx = other[0] - point[0]
+                        dy = other[1] - point[1]
+                        dz = other[2] - point[2]
+                        if dx * dx + dy * dy + dz * dz <= radius_sq:
+                            found.append(item)
+        return found
+
+
+###############################################################
+# Agrupamento das extremidades em nós compartilhados
+###############################################################
+SNAP_TOLERANCE = 1.0 / 32.0  # ~1 cm, em pés
+
+
+def _find(parent, i):
+    root = i
+    while parent[root] != root:
+        root = parent[root]
+    while parent[i] != root:
+        parent[i], i = root, parent[i]
+    return root
+
+
+def snap_endpoints(endpoints, tolerance=SNAP_TOLERANCE):
+    """
+    Junta as extremidades a até 'tolerance' umas das outras em um mesmo nó,
+    formando o grafo das paredes. Os pontos são visitados na ordem do scan:
+    o primeiro de cada grupo é a semente (posição do nó) e os seguintes vão
+    para a semente mais próxima a até 'tolerance'. Assim nenhum ponto se
+    move mais que 'tolerance' e um grupo não se estende em cadeia.
+
+    Retorna (endpoints, nodes, edges): as novas extremidades de cada parede,
+    a posição de cada nó e o par (nó inicial, nó final) de cada parede.
+    Uma parede cujas duas extremidades cairiam no mesmo nó mantém as
+    originais, para não virar uma linha de comprimento zero.
+    """
+    grid = PointGrid(tolerance)
+    nodes = []
+    tolerance_sq = tolerance * tolerance
+
+    def node_for(point):
+        best = None
+        best_sq = tolerance_sq
+        for node in grid.near(point, tolerance):
+            seed = nodes[node]
+            dx = seed[0] - point[0]
+            dy = seed[1] - point[1]
+            dz = seed[2] - point[2]
+            distance_sq = dx * dx + dy * dy + dz * dz
+            if distance_sq <= best_sq:
+                best, best_sq = node, distance_sq
+        if best is None:
+            best = len(nodes)
+            nodes.append(point)
+            grid.insert(point, best)
+        return best
+
+    snapped = []
+    edges = []
+    for original in endpoints:
+        a = node_for(original[0])
+        b = node_for(original[1])
+        edges.append((a, b))
+        snapped.append(original if a == b else (nodes[a], nodes[b]))
+    return snapped, nodes, edges
+
+
+def connected_walls(endpoints, tolerance=SNAP_TOLERANCE):
+    """
+    Agrupa as paredes ligadas pelas extremidades (cômodos ou trechos
+    contínuos). As extremidades são unidas em nós pela grade, como em
+    snap_endpoints, então pontas a até 'tolerance' umas das outras contam
+    como ligadas mesmo sem SNAP_ENDPOINTS. Retorna listas de índices de
+    paredes, na ordem do scan.
+    """
+    nodes, edges = snap_endpoints(endpoints, tolerance)[1:]
+    parent = list(range(len(nodes)))
+    for a, b in edges:
+        root_a = _find(parent, a)
+        root_b = _find(parent, b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups = {}
+    order = []
+    for i, (node, _) in enumerate(edges):
+        root = _find(parent, node)
+        if root not in groups:
+            groups[root] = []
+            order.append(root)
+        groups[root].append(i)
+    return [groups[root] for root in order]
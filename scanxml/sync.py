@@ -0,0 +1,154 @@
+"""
+Identificação estável das paredes do scan para a re-sincronização.
+
+O XML do pcon.scan não traz identificadores, então cada parede recebe uma
+chave derivada da sua linha base (extremidades arredondadas para uma grade
+de SYNC_TOLERANCE pés, sem depender do sentido da linha) e uma impressão
+digital com o restante dos dados (altura, espessura e aberturas).
+
+As chaves ficam gravadas nas paredes criadas (parâmetro Comentários) no
+formato "scanxml|<escopo>|<chave>|<impressão>". O escopo (scan_scope)
+identifica o ambiente escaneado (um nome dado pelo usuário ou, na falta
+dele, o nome do arquivo) e o nível de origem, e só as paredes do mesmo escopo
+entram no diff; importações de outros scans ou de outros níveis ficam
+intactas. As aberturas não são etiquetadas: elas fazem parte da impressão
+da parede e são apagadas junto com ela. Comparando com o novo XML:
+    keep   - mesma chave e mesma impressão: nenhuma chamada ao Revit
+    update - mesma chave, impressão diferente: parede recriada
+    create - chave nova
+    delete - chave que não existe mais no XML
+"""
+
+import hashlib
+import os
+
+TAG_PREFIX = 'scanxml'
+SYNC_TOLERANCE = 1.0 / 32.0  # ~1 cm, em pés
+SCAN_SUFFIXES = ('.scanplan', '.plan.json', '.xml')
+
+
+###############################################################
+# Chave e impressão digital
+###############################################################
+def _quantize(value, tolerance):
+    return int(round(value / tolerance))
+
+
+def wall_key(start, end, tolerance=SYNC_TOLERANCE):
+    a = tuple(_quantize(v, tolerance) for v in start)
+    b = tuple(_quantize(v, tolerance) for v in end)
+    if b < a:
+        a, b = b, a
+    text = '{},{},{};{},{},{}'.format(*(a + b))
+    return hashlib.sha1(text.encode('ascii')).hexdigest()[:16]
+
+
+def wall_fingerprint(wall, tolerance=SYNC_TOLERANCE):
+    parts = [_quantize(wall.height, tolerance), _quantize(wall.thickness, tolerance)]
+    for opening in wall.openings:
+        parts.extend((
+            opening.kind,
+            opening.alignment,
+            _quantize(opening.width, tolerance),
+            _quantize(opening.height, tolerance),
+            None if opening.parapet is None else _quantize(opening.parapet, tolerance),
+            _quantize(opening.x, tolerance),
+            _quantize(opening.z, tolerance),
+        ))
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:12]
+
+
+###############################################################
+# Etiquetas gravadas nos elementos
+###############################################################
+def scan_scope(scan_path, level_id, name=None):
+    """
+    Escopo das etiquetas: 'name' (o ambiente, para que um novo scan
+    exportado com outro nome de arquivo reencontre as paredes) e o nível.
+    Sem 'name', usa o nome do scan (sem pasta nem extensão, para que o XML,
+    o .plan.json e o .scanplan do mesmo scan coincidam).
+    """
+    if name:
+        name = name.strip().lower()
+    else:
+        name = os.path.basename(scan_path).lower()
+        for suffix in SCAN_SUFFIXES:
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+                break
+    text = '{}@{}'.format(name, level_id)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:8]
+
+
+def make_tag(scope, key, fingerprint):
+    return '{}|{}|{}|{}'.format(TAG_PREFIX, scope, key, fingerprint)
+
+
+def parse_tag(text, scope):
+    """Retorna (chave, impressão) de uma etiqueta de parede do escopo, ou None."""
+    if not text or not text.startswith(TAG_PREFIX + '|'):
+        return None
+    parts = text.split('|')
+    if len(parts) != 4 or parts[1] != scope:
+        return None
+    return parts[2], parts[3]
+
+
+###############################################################
+# Diferença entre o modelo e o novo scan
+###############################################################
+class SyncPlan(object):
+    """
+    Resultado do diff. create/update/keep são índices das paredes do novo
+    scan; delete são as chaves existentes que devem ser removidas (as de
+    update também precisam ser removidas antes de recriar).
+    """
+
+    __slots__ = ('keys', 'fingerprints', 'create', 'update', 'keep', 'delete')
+
+    def __init__(self, keys, fingerprints):
+        self.keys = keys
+        self.fingerprints = fingerprints
+        self.create = []
+        self.update = []
+        self.keep = []
+        self.delete = []
+
+    @property
+    def build(self):
+        """Índices das paredes a criar no Revit (novas e alteradas), em ordem."""
+        return sorted(self.create + self.update)
+
+    def summary(self):
+        return {
+            'create': len(self.create),
+            'update': len(self.update),
+            'keep': len(self.keep),
+            'delete': len(self.delete),
+        }
+
+
+def diff_scan(existing, walls, endpoints, tolerance=SYNC_TOLERANCE):
+    """
+    existing: {chave: impressão} lido das etiquetas do modelo, só do escopo
+    do scan atual (as demais paredes nunca entram em delete).
+    walls/endpoints: WallRecord e (início, fim) do novo scan.
+    """
+    keys = [wall_key(start, end, tolerance) for start, end in endpoints]
+    fingerprints = [wall_fingerprint(wall, tolerance) for wall in walls]
+    plan = SyncPlan(keys, fingerprints)
+    seen = set()
+    for i, (key, fingerprint) in enumerate(zip(keys, fingerprints)):
+        if key in seen:
+            # Parede duplicada no próprio scan: mantém só a primeira
+            continue
+        seen.add(key)
+        if key not in existing:
+            plan.create.append(i)
+        elif existing[key] != fingerprint:
+            plan.update.append(i)
+        else:
+            plan.keep.append(i)
+    updated = set(keys[i] for i in plan.update)
+    plan.delete = [key for key in existing if key not in seen or key in updated]
+    return plan
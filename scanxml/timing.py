@@ -0,0 +1,59 @@
+"""
+Instrumentação leve do Scan2XML.py: tempo (wall-clock) e contadores por fase.
+
+O relatório é um dicionário simples, devolvido como elemento extra do OUT
+no Dynamo e, opcionalmente, gravado em JSON ao lado do XML de entrada.
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class PhaseTimer(object):
+    """Acumula segundos e contagens por nome de fase, na ordem de criação."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.seconds = OrderedDict()
+        self.counts = OrderedDict()
+        self._started = clock()
+
+    @contextmanager
+    def phase(self, name):
+        start = self.clock()
+        try:
+            yield self
+        finally:
+            self.add(name, self.clock() - start)
+
+    def add(self, name, seconds):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def report(self):
+        return {
+            'phases': dict((name, round(value, 6)) for name, value in self.seconds.items()),
+            'counts': dict(self.counts),
+            'total': round(self.clock() - self._started, 6),
+        }
+
+
+def timing_log_path(xml_path):
+    """Caminho do log JSON ao lado do XML: structure.xml -> structure.timing.json."""
+    base, _ = os.path.splitext(xml_path)
+    return base + '.timing.json'
+
+
+def write_timing_log(report, xml_path):
+    path = timing_log_path(xml_path)
+    entry = dict(report)
+    entry['xml'] = os.path.basename(xml_path)
+    entry['timestamp'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(entry, f, indent=2)
+    return path
@@ -0,0 +1,98 @@
+"""
+Versão vetorizada (NumPy) dos cálculos de scanxml.geometry.
+
+Processa todas as paredes de uma vez: quaternions (N, 4), inícios (N, 3) e
+comprimentos (N,) viram matrizes de rotação (N, 3, 3) e as extremidades são
+obtidas com poucas operações de array, sem laço Python por parede.
+
+NumPy é opcional: sem ele, HAS_NUMPY fica False e wall_endpoints_batch
+recorre ao cálculo por parede de scanxml.geometry.
+"""
+
+from .geometry import wall_endpoints
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:  # IronPython ou CPython sem numpy
+    np = None
+    HAS_NUMPY = False
+
+
+###############################################################
+# Conversão de registros para arrays
+###############################################################
+def wall_arrays(walls):
+    """Retorna (starts (N, 3), lengths (N,), quats (N, 4)) dos WallRecord."""
+    n = len(walls)
+    starts = np.empty((n, 3))
+    lengths = np.empty(n)
+    quats = np.empty((n, 4))
+    for i, wall in enumerate(walls):
+        starts[i] = (wall.x, wall.y, wall.z)
+        lengths[i] = wall.length
+        quats[i] = (wall.qw, wall.qx, wall.qy, wall.qz)
+    return starts, lengths, quats
+
+
+###############################################################
+# Quaternions e transformações em lote
+###############################################################
+def transform_quaternions(quats):
+    # Trocar Y por Z (mesmo que geometry.transform_quaternion)
+    return quats[:, [0, 1, 3, 2]]
+
+
+def transform_points(points):
+    # (x, y, z) -> (x, -z, y), mesmo que geometry.transform_point
+    out = points[:, [0, 2, 1]]
+    out[:, 1] *= -1.0
+    return out
+
+
+def quaternions_to_matrices(quats):
+    """
+    Converte quaternions (N, 4) nas matrizes (N, 3, 3) equivalentes a q * p * q^-1.
+
+    Usa a forma homogênea (w² + x² - y² - z² na diagonal), que reproduz o
+    produto de quaternions mesmo quando o XML traz quaternions com norma
+    ligeiramente diferente de 1 (6 casas decimais).
+    """
+    w, x, y, z = quats[:, 0], quats[:, 1], quats[:, 2], quats[:, 3]
+    ww, xx, yy, zz = w * w, x * x, y * y, z * z
+    xy, xz, yz = x * y, x * z, y * z
+    wx, wy, wz = w * x, w * y, w * z
+    m = np.empty((len(quats), 3, 3))
+    m[:, 0, 0] = ww + xx - yy - zz
+    m[:, 0, 1] = 2.0 * (xy - wz)
+    m[:, 0, 2] = 2.0 * (xz + wy)
+    m[:, 1, 0] = 2.0 * (xy + wz)
+    m[:, 1, 1] = ww - xx + yy - zz
+    m[:, 1, 2] = 2.0 * (yz - wx)
+    m[:, 2, 0] = 2.0 * (xz - wy)
+    m[:, 2, 1] = 2.0 * (yz + wx)
+    m[:, 2, 2] = ww - xx - yy + zz
+    return m
+
+
+def batch_wall_endpoints(starts, lengths, quats):
+    """
+    Extremidades de N paredes no sistema Dynamo/Revit.
+
+    O fim de cada parede é início + R * (length, 0, 0), ou seja, a primeira
+    coluna da matriz de rotação escalada pelo comprimento.
+    """
+    matrices = quaternions_to_matrices(transform_quaternions(quats))
+    ends = starts + matrices[:, :, 0] * lengths[:, None]
+    return transform_points(starts), transform_points(ends)
+
+
+###############################################################
+# Ponto de entrada usado pelo Scan2XML.py
+###############################################################
+def wall_endpoints_batch(walls):
+    """Lista de (início, fim) para cada WallRecord, vetorizada quando possível."""
+    if not HAS_NUMPY or not walls:
+        return [wall_endpoints(wall) for wall in walls]
+    starts, ends = batch_wall_endpoints(*wall_arrays(walls))
+    return list(zip(map(tuple, starts.tolist()), map(tuple, ends.tolist())))